@@ -0,0 +1,761 @@
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.profiler import column_roles, measure_columns
+from analysis.packs.snapshot_pack import snapshot_from_stats
+from analysis.packs.categorical_pack import (
+    TIME_BUDGET_S as CATEGORICAL_TIME_BUDGET_S, association_columns, categorical_associations, categorical_from_stats,
+)
+from analysis.packs.numeric_pack import HIST_BINS, MAX_MATRIX_COLS, TOP_CORR_PAIRS, run_numeric_pack as run_numeric_pack_pandas
+from analysis.packs.timeseries_pack import hourly_from_table, timeseries_from_hourly
+from analysis.packs.outlier_pack import TOP_ROWS, multivariate_outliers, outliers_from_stats
+from analysis.outliers import MAD_C, MAD_Z
+from analysis.sampling import Sampler, mean_ci, stage_budget
+from analysis.packs.segment_pack import TOP_DEVIATIONS, group_label, segment_from_stats, segment_keys
+from analysis.packs.text_pack import N_FEATURES, TOP_TERMS, term_stats, text_from_stats
+from analysis.hypothesis_verify import (
+    IQR_K,
+    MIN_PAIRS,
+    _not_found,
+    group_diff_evidence,
+    outlier_evidence,
+    trend_evidence,
+    verify_hypotheses as _verify_with,
+)
+from analysis.drift import SKETCH_BINS, SKETCH_TOP_K, SKETCH_VERSION, numeric_sketch
+
+# 0 = DuckDB default (one thread per core)
+DUCKDB_THREADS = int(os.getenv("DUCKDB_THREADS", "0"))
+# e.g. "4GB"; beyond it DuckDB spills to its temp directory instead of failing
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT", "")
+
+_READERS = {
+    ".csv": "read_csv_auto",
+    ".parquet": "read_parquet",
+    ".jsonl": "read_json_auto",
+    ".ndjson": "read_json_auto",
+}
+SUPPORTED_SUFFIXES = set(_READERS)
+
+# numeric columns with at most this many distinct values get exact drift sketches
+SKETCH_EXACT_DISTINCT = 4096
+
+_INT_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT"}
+
+
+def _duckdb():
+    try:
+        import duckdb
+    except ImportError as e:
+        raise RuntimeError("The duckdb backend needs the `duckdb` package (pip install duckdb).") from e
+    return duckdb
+
+
+def _ident(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _dbl(name: str) -> str:
+    return f"CAST({_ident(name)} AS DOUBLE)"
+
+
+def _float(v: Any) -> str:
+    """A float as an SQL literal (NULL for NaN)."""
+    return "NULL" if v is None or np.isnan(v) else repr(float(v))
+
+
+def _pandas_dtype(duck_type: str) -> str:
+    """Maps DuckDB column types onto the pandas dtype names used in schemas and sketches."""
+    t = duck_type.upper()
+    if t in _INT_TYPES:
+        return "int64"
+    if t.startswith(("DOUBLE", "FLOAT", "REAL", "DECIMAL")):
+        return "float64"
+    if t == "BOOLEAN":
+        return "bool"
+    if t.startswith(("TIMESTAMP", "DATE")):
+        return "datetime64[ns]"
+    return "object"
+
+
+class DuckDBSource:
+    """
+    A data file registered as the view `src` in its own in-memory DuckDB database.
+    Nothing is materialized: every aggregation scans the file (multi-threaded,
+    spilling to disk past DUCKDB_MEMORY_LIMIT).
+    """
+
+    backend = "duckdb"
+
+    def __init__(self, file_path: str):
+        p = Path(file_path)
+        if not p.exists():
+            raise FileNotFoundError(file_path)
+        suffix = p.suffix.lower()
+        if suffix not in _READERS:
+            raise ValueError(f"duckdb backend does not read {suffix} files")
+
+        duckdb = _duckdb()
+        self.path = str(p)
+        self.con = duckdb.connect(database=":memory:")
+        if DUCKDB_THREADS > 0:
+            self.con.execute(f"SET threads = {DUCKDB_THREADS}")
+        if DUCKDB_MEMORY_LIMIT:
+            self.con.execute(f"SET memory_limit = {_literal(DUCKDB_MEMORY_LIMIT)}")
+
+        self.con.execute(f"CREATE VIEW raw AS SELECT * FROM {_READERS[suffix]}({_literal(self.path)})")
+        described = self.con.execute("DESCRIBE raw").fetchall()
+        # same normalization as analysis.ingest: drop auto-index columns from CSV exports
+        keep = [(str(r[0]), str(r[1])) for r in described if not str(r[0]).strip().lower().startswith("unnamed:")]
+        self.con.execute("CREATE VIEW src AS SELECT " + ", ".join(_ident(c) for c, _ in keep) + " FROM raw")
+
+        self.duck_types: Dict[str, str] = dict(keep)
+        self.dtypes: Dict[str, str] = {c: _pandas_dtype(t) for c, t in keep}
+        self.columns: List[str] = [c for c, _ in keep]
+        self.n_rows = int(self.query("SELECT count(*) FROM src")[0][0])
+        # full-scan results reused across stages (schema, duplicate count)
+        self.cache: Dict[str, Any] = {}
+
+    def query(self, sql: str, params: Optional[list] = None) -> list:
+        # a cursor per call: DuckDB connections are not safe to share across threads
+        cur = self.con.cursor()
+        try:
+            return cur.execute(sql, params or []).fetchall()
+        finally:
+            cur.close()
+
+    def query_df(self, sql: str, params: Optional[list] = None) -> pd.DataFrame:
+        cur = self.con.cursor()
+        try:
+            return cur.execute(sql, params or []).df()
+        finally:
+            cur.close()
+
+    def is_numeric(self, col: Any) -> bool:
+        return self.dtypes.get(col) in ("int64", "float64", "bool")
+
+    def sample_df(self, k: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Uniform reservoir sample of k rows (the whole table when it is smaller)."""
+        cols = ", ".join(_ident(c) for c in (columns or self.columns))
+        if self.n_rows <= k:
+            return self.query_df(f"SELECT {cols} FROM src")
+        return self.query_df(f"SELECT {cols} FROM src USING SAMPLE reservoir({int(k)} ROWS) REPEATABLE (42)")
+
+    def close(self) -> None:
+        self.con.close()
+
+
+# -------------------------
+# Ingest / profile
+# -------------------------
+def infer_schema(src: DuckDBSource) -> Dict[str, Any]:
+    """Same shape as analysis.ingest.infer_schema (one scan for all columns)."""
+    if "schema" in src.cache:
+        return src.cache["schema"]
+    exprs: List[str] = []
+    for c in src.columns:
+        exprs += [f"count(*) - count({_ident(c)})", f"count(DISTINCT {_ident(c)})"]
+    row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0] if exprs else ()
+
+    cols = [
+        {"name": c, "dtype": src.dtypes[c], "missing": int(row[2 * i]), "n_unique": int(row[2 * i + 1])}
+        for i, c in enumerate(src.columns)
+    ]
+    src.cache["schema"] = {"n_rows": src.n_rows, "n_cols": len(cols), "columns": cols}
+    return src.cache["schema"]
+
+
+def duplicate_rows(src: DuckDBSource) -> int:
+    if "duplicates" not in src.cache:
+        distinct = src.query("SELECT count(*) FROM (SELECT DISTINCT * FROM src)")[0][0]
+        src.cache["duplicates"] = int(src.n_rows - distinct)
+    return src.cache["duplicates"]
+
+
+def top_values(src: DuckDBSource, col: str, k: int) -> Dict[Any, int]:
+    q = _ident(col)
+    rows = src.query(f"SELECT {q}, count(*) AS n FROM src WHERE {q} IS NOT NULL GROUP BY 1 ORDER BY n DESC LIMIT {int(k)}")
+    return {v: int(n) for v, n in rows}
+
+
+def basic_profile(src: DuckDBSource, sample: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Same shape as analysis.profiler.basic_profile. Roles are inferred from a typed
+    sample; counts, id-likeness, top values and numeric summaries use the full data.
+    """
+    schema = infer_schema(src)
+    roles = column_roles(sample)
+    n = max(int(schema.get("n_rows", 0)), 1)
+    cols = schema.get("columns", [])
+    roles["id_like"] = [c["name"] for c in cols if c["n_unique"] > 20 and c["n_unique"] / n > 0.9]
+
+    numeric = [c for c in roles["numeric"] if src.is_numeric(c)]
+    numeric_summary: Dict[str, Dict[str, float]] = {}
+    if numeric:
+        exprs: List[str] = []
+        for c in numeric:
+            x = _dbl(c)
+            exprs += [f"count({x})", f"avg({x})", f"stddev_samp({x})", f"min({x})",
+                      f"approx_quantile({x}, [0.25, 0.5, 0.75])", f"max({x})"]
+        row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0]
+        for i, c in enumerate(numeric):
+            cnt, mean, std, lo, qs, hi = row[6 * i: 6 * i + 6]
+            qs = qs or [None, None, None]
+            numeric_summary[c] = {
+                "count": float(cnt), "mean": mean, "std": std, "min": lo,
+                "25%": qs[0], "50%": qs[1], "75%": qs[2], "max": hi,
+            }
+
+    return {
+        "roles": roles,
+        "missing_total": int(sum(c["missing"] for c in cols)),
+        "duplicates": duplicate_rows(src),
+        "top_categoricals": {c: top_values(src, c, 5) for c in roles["categorical"][:8]},
+        "numeric_summary": numeric_summary,
+    }
+
+
+# -------------------------
+# Packs (same dict shapes as analysis/packs)
+# -------------------------
+def _json_safe_rows(d: pd.DataFrame) -> List[Dict[str, Any]]:
+    # typed timestamps become ISO text, as they are in pandas-read CSVs
+    for c in d.columns:
+        if pd.api.types.is_datetime64_any_dtype(d[c]):
+            d[c] = d[c].dt.strftime("%Y-%m-%d %H:%M:%S").where(d[c].notna(), None)
+    return d.to_dict(orient="records")
+
+
+def run_snapshot_pack(src: DuckDBSource) -> Dict[str, Any]:
+    missing = (
+        pd.Series({c["name"]: int(c["missing"]) for c in infer_schema(src)["columns"]}, dtype="int64")
+        .sort_values(ascending=False)
+        .head(20)
+    )
+    return snapshot_from_stats(
+        n_rows=src.n_rows,
+        n_cols=len(src.columns),
+        duplicate_rows=duplicate_rows(src),
+        sample_rows=_json_safe_rows(src.query_df("SELECT * FROM src LIMIT 5")),
+        missing=missing,
+    )
+
+
+def run_categorical_pack(
+    src: DuckDBSource,
+    categorical_cols: List[str],
+    *,
+    top_k: int = 10,
+    max_cols: Optional[int] = None,
+    time_budget_s: float = CATEGORICAL_TIME_BUDGET_S,
+) -> Dict[str, Any]:
+    """One GROUP BY per column (distinct and missing counts come from the cached schema scan), within the time budget."""
+    schema = {c["name"]: c for c in infer_schema(src)["columns"]}
+    n_unique = {c: int(st["n_unique"]) for c, st in schema.items()}
+    cols = [c for c in categorical_cols if c in src.dtypes][:max_cols]
+    stats: Dict[str, Dict[str, Any]] = {}
+    deadline = time.monotonic() + time_budget_s
+    for c in cols:
+        if stats and time.monotonic() > deadline:
+            break
+        stats[c] = {"top_values": top_values(src, c, top_k), "n_unique": n_unique[c], "n_valid": src.n_rows - int(schema[c]["missing"])}
+    # Cramér's V on a reservoir sample of the narrow columns (full table when it fits the budget)
+    assoc_cols = association_columns(list(stats), n_unique)
+    associations = (
+        categorical_associations(src.sample_df(stage_budget("correlation"), columns=assoc_cols), assoc_cols, n_unique)
+        if len(assoc_cols) >= 2 else []
+    )
+    return categorical_from_stats(src.n_rows, stats, top_k=top_k, associations=associations, not_counted=cols[len(stats):])
+
+
+def run_numeric_pack(
+    src: DuckDBSource,
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_corr_cols: int = 12,
+    corr_sample_rows: int = 50000,
+    hist_sample_rows: int = 20000,
+    corr_cols: Optional[List[str]] = None,
+    hist_bins: int = HIST_BINS,
+    method: str = "pearson",
+    max_matrix_cols: int = MAX_MATRIX_COLS,
+    top_k: int = TOP_CORR_PAIRS,
+) -> Dict[str, Any]:
+    """
+    Correlations and histograms are sample-based in the pandas pack too, so one
+    reservoir sample is pulled from the engine and handed to that pack; the
+    summary statistics are then replaced with full-data aggregates, and the
+    histogram mean intervals are recomputed against the full table.
+    """
+    cols = [c for c in numeric_cols if src.is_numeric(c)]
+    sample = src.sample_df(max(corr_sample_rows, hist_sample_rows), columns=cols) if cols else pd.DataFrame()
+    sampler = Sampler(sample)
+    out = run_numeric_pack_pandas(
+        sample, cols, id_like,
+        max_corr_cols=max_corr_cols, corr_sample_rows=corr_sample_rows, hist_sample_rows=hist_sample_rows,
+        corr_cols=corr_cols, hist_bins=hist_bins, method=method, max_matrix_cols=max_matrix_cols, top_k=top_k,
+        sampler=sampler,
+    )
+    if out.get("skipped"):
+        return out
+
+    used = [c for c in cols if c not in set(id_like or [])][:8]
+    exprs = [e for c in used for e in (f"avg({_dbl(c)})", f"stddev_samp({_dbl(c)})", f"min({_dbl(c)})", f"max({_dbl(c)})")]
+    row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0]
+    out["summary"]["basic_stats"] = {
+        c: {k: (round(float(v), 4) if v is not None else None) for k, v in zip(("mean", "std", "min", "max"), row[4 * i: 4 * i + 4])}
+        for i, c in enumerate(used)
+    }
+
+    # the pack saw the reservoir sample as its population; report the real one
+    hist = out.get("histograms") or {}
+    if hist:
+        n_valid = src.query("SELECT " + ", ".join(f"count({_ident(c)})" for c in hist) + " FROM src")[0]
+        for (c, h), n in zip(hist.items(), n_valid):
+            hs, _ = sampler.sample("histogram", budget=hist_sample_rows, columns=[c])
+            h["mean_ci"] = mean_ci(hs[c], n_total=int(n))
+    for info in (out.get("sampling") or {}).values():
+        info["n_total"] = src.n_rows
+        info["fraction"] = float(info.get("n_sample", 0) / max(src.n_rows, 1))
+        if info["n_sample"] < src.n_rows:
+            info["method"] = "reservoir"
+    return out
+
+
+def run_timeseries_pack(
+    src: DuckDBSource,
+    datetime_col: str,
+    numeric_cols: List[str],
+    *,
+    freq: str = "D",
+    rolling_window: int = 7,
+) -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "datetime_col": datetime_col,
+        "numeric_cols": numeric_cols[:5],
+        "insights": [],
+        "charts": [],
+    }
+    if datetime_col not in src.dtypes:
+        out["skipped"] = f"Datetime column '{datetime_col}' not found."
+        return out
+
+    ts = f"TRY_CAST({_ident(datetime_col)} AS TIMESTAMP)"
+    out["n_points"] = int(src.query(f"SELECT count({ts}) FROM src")[0][0])
+    if out["n_points"] == 0 or not numeric_cols:
+        out["skipped"] = "Not enough datetime rows or no numeric columns."
+        return out
+
+    use_num = [c for c in numeric_cols if src.is_numeric(c)]
+    if not use_num:
+        out["skipped"] = "No numeric columns found in dataframe."
+        return out
+
+    # one scan for hourly aggregates; the cube's coarser levels are rolled up from them
+    aggs = ", ".join(f"count({_dbl(c)}), sum({_dbl(c)}), min({_dbl(c)}), max({_dbl(c)})" for c in use_num)
+    rows = src.query(
+        f"SELECT CAST(floor(epoch_ms({ts}) / 3600000.0) AS BIGINT) AS h, count(*), {aggs} "
+        f"FROM src WHERE {ts} IS NOT NULL GROUP BY 1 ORDER BY 1"
+    )
+    hourly = hourly_from_table(np.array(rows, dtype=float))
+    return timeseries_from_hourly(out, hourly, use_num, freq=freq, rolling_window=rolling_window)
+
+
+def run_segment_pack(
+    src: DuckDBSource,
+    categorical_cols: List[str],
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_keys: int = 3,
+    max_cardinality: int = 30,
+    max_cols: int = 8,
+    top_k: int = TOP_DEVIATIONS,
+) -> Dict[str, Any]:
+    """Every key and the overall row come from one scan (GROUP BY GROUPING SETS)."""
+    n_unique = {c["name"]: int(c["n_unique"]) for c in infer_schema(src)["columns"]}
+    keys = segment_keys([c for c in categorical_cols if c in src.dtypes], n_unique, id_like, max_keys=max_keys, max_cardinality=max_cardinality)
+    cols = measure_columns(
+        [c for c in numeric_cols if src.is_numeric(c) and c not in keys],
+        id_like, lambda c: src.duck_types.get(c) in _INT_TYPES, max_cols=max_cols,
+    )
+    if not keys or not cols:
+        return segment_from_stats(src.n_rows, {}, {}, top_k=top_k)
+
+    flags = ", ".join(f"GROUPING({_ident(k)})" for k in keys)
+    aggs = ", ".join(f"count({_dbl(c)}), avg({_dbl(c)}), median({_dbl(c)}), stddev_samp({_dbl(c)})" for c in cols)
+    sets = ", ".join([f"({_ident(k)})" for k in keys] + ["()"])
+    rows = src.query(f"SELECT {flags}, {', '.join(_ident(k) for k in keys)}, count(*), {aggs} FROM src GROUP BY GROUPING SETS ({sets})")
+
+    nk = len(keys)
+    overall: Dict[str, Any] = {}
+    segments: Dict[str, Any] = {k: {"n_unique": 0, "groups": []} for k in keys}
+    for r in rows:
+        stats = {c: dict(zip(("count", "mean", "median", "std"), r[2 * nk + 1 + 4 * i: 2 * nk + 5 + 4 * i])) for i, c in enumerate(cols)}
+        grouped = [i for i in range(nk) if r[i] == 0]
+        if not grouped:
+            overall = stats
+            continue
+        value = r[nk + grouped[0]]
+        if value is None:
+            continue
+        segments[keys[grouped[0]]]["groups"].append({
+            "value": group_label(value), "rows": int(r[2 * nk]),
+            "columns": {c: {s: st[s] for s in ("count", "mean", "median")} for c, st in stats.items()},
+        })
+    for seg in segments.values():
+        seg["n_unique"] = len(seg["groups"])
+    return segment_from_stats(src.n_rows, overall, segments, top_k=top_k)
+
+
+def run_outlier_pack(
+    src: DuckDBSource,
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_cols: int = 12,
+    top_rows: int = TOP_ROWS,
+    multivariate: bool = True,
+    sample_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Same statistics as the pandas pack in three scans: quartiles and medians, the MADs,
+    then both outlier counts with the furthest rows (max_by over file row numbers).
+    The multivariate score runs on a reservoir sample.
+    """
+    cols = measure_columns(
+        [c for c in numeric_cols if src.is_numeric(c)], id_like, lambda c: src.duck_types.get(c) in _INT_TYPES, max_cols=max_cols,
+    )
+    if not cols:
+        return outliers_from_stats(src.n_rows, [], {}, {})
+
+    row = src.query("SELECT " + ", ".join(f"count({_dbl(c)}), quantile_cont({_dbl(c)}, [0.25, 0.5, 0.75])" for c in cols) + " FROM src")[0]
+    n = np.array([row[2 * i] for i in range(len(cols))], dtype=float)
+    q = np.array([row[2 * i + 1] or [None] * 3 for i in range(len(cols))], dtype=float).T
+    med = q[1]
+    mads = src.query("SELECT " + ", ".join(f"median(abs({_dbl(c)} - {_float(m)}))" for c, m in zip(cols, med)) + " FROM src")[0]
+    mad = np.array(mads, dtype=float)
+    iqr = q[2] - q[0]
+    lo, hi = q[0] - IQR_K * iqr, q[2] + IQR_K * iqr
+
+    exprs, used = [], []
+    for i, c in enumerate(cols):
+        if not n[i]:
+            continue
+        used.append(i)
+        x = _dbl(c)
+        dist = f"abs({MAD_C} * ({x} - {_float(med[i])}) / {_float(mad[i])})" if mad[i] > 0 else f"abs({x} - {_float(med[i])})"
+        exprs += [
+            f"count(*) FILTER (WHERE {x} < {_float(lo[i])} OR {x} > {_float(hi[i])})",
+            f"count(*) FILTER (WHERE {dist} > {MAD_Z})" if mad[i] > 0 else "0",
+            f"max_by({{'i': __row__, 'v': {x}}}, {{'d': {dist}, 'r': -__row__}}, {int(top_rows)}) FILTER (WHERE {x} IS NOT NULL)",
+        ]
+    numbered = "(SELECT row_number() OVER () - 1 AS __row__, " + ", ".join(_ident(c) for c in cols) + " FROM src)"
+    res = src.query(f"SELECT {', '.join(exprs)} FROM {numbered}")[0] if exprs else ()
+    st = {"n": n, "q1": q[0], "median": med, "q3": q[2], "lo": lo, "hi": hi, "mad": mad,
+          "n_iqr": np.zeros(len(cols)), "n_mad": np.zeros(len(cols))}
+    tops: Dict[str, List[Dict[str, Any]]] = {}
+    for k, i in enumerate(used):
+        st["n_iqr"][i], st["n_mad"][i] = res[3 * k], res[3 * k + 1]
+        tops[cols[i]] = [
+            {"row": int(r["i"]), "value": float(r["v"]),
+             "robust_z": float(MAD_C * (r["v"] - med[i]) / mad[i]) if mad[i] > 0 else None}
+            for r in res[3 * k + 2] or []
+        ]
+
+    mv = None
+    if multivariate and len(cols) >= 2:
+        k = int(sample_rows or stage_budget("outliers"))
+        sample = src.query_df(f"SELECT * FROM {numbered}" + (f" USING SAMPLE reservoir({k} ROWS) REPEATABLE (42)" if src.n_rows > k else ""))
+        sample = sample.set_index("__row__").sort_index()
+        info = {"stage": "outliers", "n_total": src.n_rows, "budget": k, "method": "reservoir" if src.n_rows > k else "full",
+                "n_sample": int(len(sample)), "fraction": float(len(sample) / max(src.n_rows, 1))}
+        mv = multivariate_outliers(sample[cols], med, top_rows=top_rows, info=info)
+    return outliers_from_stats(src.n_rows, cols, st, tops, mv)
+
+
+def run_text_pack(
+    src: DuckDBSource,
+    text_cols: List[str],
+    *,
+    max_cols: int = 4,
+    top_k: int = TOP_TERMS,
+    n_features: int = N_FEATURES,
+    sample_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Lengths and blank counts of every row in one scan; token and bigram
+    frequencies on a reservoir sample, as in the pandas pack.
+    """
+    cols = [c for c in text_cols if c in src.dtypes][:max_cols]
+    if not cols:
+        return text_from_stats(src.n_rows, {}, {})
+
+    exprs = []
+    for c in cols:
+        x = f"CAST({_ident(c)} AS VARCHAR)"
+        exprs += [
+            f"count({x})",
+            f"count(*) FILTER (WHERE regexp_full_match({x}, '\\s*'))",
+            f"avg(length({x}))",
+            f"quantile_cont(length({x}), [0.1, 0.5, 0.9])",
+            f"max(length({x}))",
+        ]
+    row = src.query(f"SELECT {', '.join(exprs)} FROM src")[0]
+    lengths: Dict[str, Dict[str, Any]] = {}
+    for i, c in enumerate(cols):
+        n_valid, n_blank, mean_len, q, max_len = row[5 * i:5 * i + 5]
+        q = q or [None] * 3
+        lengths[c] = {
+            "n": src.n_rows, "n_valid": int(n_valid), "n_blank": int(n_blank),
+            "mean_len": None if mean_len is None else float(mean_len),
+            "p10_len": None if q[0] is None else float(q[0]),
+            "p50_len": None if q[1] is None else float(q[1]),
+            "p90_len": None if q[2] is None else float(q[2]),
+            "max_len": None if max_len is None else int(max_len),
+        }
+
+    k = int(sample_rows or stage_budget("text"))
+    sample = src.sample_df(k, columns=cols)
+    info = {"stage": "text", "n_total": src.n_rows, "budget": k, "method": "reservoir" if src.n_rows > k else "full",
+            "n_sample": int(len(sample)), "fraction": float(len(sample) / max(src.n_rows, 1))}
+    terms = {c: term_stats(sample[c], n_features=n_features, top_k=top_k) for c in cols}
+    return text_from_stats(src.n_rows, lengths, terms, info)
+
+
+# -------------------------
+# Hypothesis verification (same evidence as analysis.hypothesis_verify)
+# -------------------------
+def _verify_missingness(src: DuckDBSource, hyps, payloads, profile) -> None:
+    cols = list(dict.fromkeys(h.get("col") for h in hyps if h.get("col") in src.dtypes))
+    if not cols:
+        return
+    row = src.query("SELECT " + ", ".join(f"avg(CASE WHEN {_ident(c)} IS NULL THEN 1.0 ELSE 0.0 END)" for c in cols) + " FROM src")[0]
+    rates = dict(zip(cols, row))
+    for h, payload in zip(hyps, payloads):
+        if h.get("col") in rates:
+            payload["verified"] = True
+            payload["evidence"] = {"missing_rate": float(rates[h["col"]] or 0.0)}
+
+
+def _verify_category_dominance(src: DuckDBSource, hyps, payloads, profile) -> None:
+    cached = (profile or {}).get("top_categoricals", {}) or {}
+    cols = list(dict.fromkeys(h.get("col") for h in hyps if h.get("col") in src.dtypes))
+    if not cols:
+        return
+    non_null = dict(zip(cols, src.query("SELECT " + ", ".join(f"count({_ident(c)})" for c in cols) + " FROM src")[0]))
+    for h, payload in zip(hyps, payloads):
+        col = h.get("col")
+        if col not in non_null:
+            continue
+        top = cached.get(col) if isinstance(cached.get(col), dict) and cached.get(col) else top_values(src, col, 1)
+        if not top:
+            continue
+        value, count = next(iter(top.items()))
+        payload["verified"] = True
+        payload["evidence"] = {"top_value": str(value), "top_share": float(count / max(int(non_null[col]), 1))}
+
+
+def _verify_correlation(src: DuckDBSource, hyps, payloads, profile) -> None:
+    pairs = [(h.get("x"), h.get("y")) for h in hyps]
+    usable = list(dict.fromkeys(p for p in pairs if src.is_numeric(p[0]) and src.is_numeric(p[1])))
+    stats: Dict[tuple, tuple] = {}
+    if usable:
+        exprs = [e for x, y in usable for e in (f"corr({_dbl(x)}, {_dbl(y)})", f"regr_count({_dbl(x)}, {_dbl(y)})")]
+        row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0]
+        stats = {p: (row[2 * i], int(row[2 * i + 1])) for i, p in enumerate(usable)}
+
+    for (x, y), payload in zip(pairs, payloads):
+        if (x, y) not in stats:
+            _not_found(payload, x, y)
+            continue
+        r, n = stats[(x, y)]
+        if n < MIN_PAIRS or r is None or not np.isfinite(r):
+            continue
+        payload["verified"] = True
+        payload["evidence"] = {"pearson_corr": float(r), "n": n}
+
+
+def _verify_group_mean_diff(src: DuckDBSource, hyps, payloads, profile) -> None:
+    by_key: Dict[Any, List[int]] = {}
+    for k, h in enumerate(hyps):
+        by_key.setdefault(h.get("by"), []).append(k)
+
+    for by, idxs in by_key.items():
+        cols = list(dict.fromkeys(hyps[k].get("col") for k in idxs if src.is_numeric(hyps[k].get("col"))))
+        if by not in src.dtypes or not cols:
+            for k in idxs:
+                _not_found(payloads[k], hyps[k].get("col"), by)
+            continue
+
+        # one GROUP BY for every measure compared across this key
+        aggs = ", ".join(
+            f"count({_dbl(c)}) AS c{i}, avg({_dbl(c)}) AS m{i}, var_samp({_dbl(c)}) AS v{i}" for i, c in enumerate(cols)
+        )
+        agg = src.query_df(f"SELECT {_ident(by)} AS grp, {aggs} FROM src WHERE {_ident(by)} IS NOT NULL GROUP BY 1").set_index("grp")
+        for k in idxs:
+            col = hyps[k].get("col")
+            if col not in cols:
+                _not_found(payloads[k], col, by)
+                continue
+            i = cols.index(col)
+            g = agg[[f"c{i}", f"m{i}", f"v{i}"]].set_axis(["count", "mean", "var"], axis=1).astype(float)
+            evidence = group_diff_evidence(g)
+            if evidence is not None:
+                payloads[k]["verified"] = True
+                payloads[k]["evidence"] = evidence
+
+
+def _verify_trend(src: DuckDBSource, hyps, payloads, profile) -> None:
+    default_time = ((profile or {}).get("roles", {}) or {}).get("datetime", [None])
+    by_time: Dict[Any, List[int]] = {}
+    for k, h in enumerate(hyps):
+        by_time.setdefault(h.get("time") or (default_time[0] if default_time else None), []).append(k)
+
+    for time_col, idxs in by_time.items():
+        cols = list(dict.fromkeys(hyps[k].get("col") for k in idxs if src.is_numeric(hyps[k].get("col"))))
+        if time_col not in src.dtypes or not cols:
+            for k in idxs:
+                _not_found(payloads[k], hyps[k].get("col"), time_col)
+            continue
+
+        days = f"(epoch(TRY_CAST({_ident(time_col)} AS TIMESTAMP)) / 86400.0)"
+        exprs = [e for c in cols for e in (f"corr({_dbl(c)}, {days})", f"regr_slope({_dbl(c)}, {days})", f"regr_count({_dbl(c)}, {days})")]
+        row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0]
+        for k in idxs:
+            col = hyps[k].get("col")
+            if col not in cols:
+                _not_found(payloads[k], col, time_col)
+                continue
+            i = cols.index(col)
+            r, slope, n = row[3 * i], row[3 * i + 1], int(row[3 * i + 2])
+            if n < MIN_PAIRS or r is None or not np.isfinite(r):
+                continue
+            payloads[k]["verified"] = True
+            payloads[k]["evidence"] = trend_evidence(time_col, float(r), float(slope or 0.0), n)
+
+
+def _verify_outlier_share(src: DuckDBSource, hyps, payloads, profile) -> None:
+    cols = list(dict.fromkeys(h.get("col") for h in hyps if src.is_numeric(h.get("col"))))
+    fences: Dict[str, tuple] = {}
+    counts: Dict[str, tuple] = {}
+    if cols:
+        qs = src.query("SELECT " + ", ".join(f"quantile_cont({_dbl(c)}, [0.25, 0.75])" for c in cols) + " FROM src")[0]
+        for c, q in zip(cols, qs):
+            if q and q[0] is not None:
+                iqr = q[1] - q[0]
+                fences[c] = (q[0] - IQR_K * iqr, q[1] + IQR_K * iqr)
+        used = [c for c in cols if c in fences]
+        if used:
+            exprs = [
+                e for c in used for e in (
+                    f"count({_dbl(c)})",
+                    f"count(*) FILTER (WHERE {_dbl(c)} < {fences[c][0]!r} OR {_dbl(c)} > {fences[c][1]!r})",
+                )
+            ]
+            row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0]
+            counts = {c: (int(row[2 * i]), int(row[2 * i + 1])) for i, c in enumerate(used)}
+
+    for h, payload in zip(hyps, payloads):
+        col = h.get("col")
+        if col not in cols:
+            _not_found(payload, col)
+            continue
+        if col not in fences or counts[col][0] == 0:
+            continue
+        n_valid, n_out = counts[col]
+        payload["verified"] = True
+        payload["evidence"] = outlier_evidence(n_out, n_valid, *fences[col])
+
+
+_SQL_VERIFIERS = {
+    "missingness": _verify_missingness,
+    "category_dominance": _verify_category_dominance,
+    "correlation": _verify_correlation,
+    "group_mean_diff": _verify_group_mean_diff,
+    "trend": _verify_trend,
+    "outlier_share": _verify_outlier_share,
+}
+
+
+def verify_hypotheses(src: DuckDBSource, hypotheses: List[Dict[str, Any]], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return _verify_with(src, hypotheses, profile, verifiers=_SQL_VERIFIERS)
+
+
+# -------------------------
+# Drift sketch (same layout as analysis.drift.build_sketch)
+# -------------------------
+def build_sketch(src: DuckDBSource, roles: Dict[str, List[str]]) -> Dict[str, Any]:
+    numeric = [c for c in roles.get("numeric", []) if src.is_numeric(c)]
+    categorical = [c for c in roles.get("categorical", []) if c in src.dtypes]
+    meta = {c["name"]: c for c in infer_schema(src)["columns"]}
+    n = src.n_rows
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    if numeric:
+        fin = {c: f"CASE WHEN isfinite({_dbl(c)}) THEN {_dbl(c)} END" for c in numeric}
+        probs = "[" + ", ".join(repr(float(p)) for p in np.linspace(0.0, 1.0, SKETCH_BINS + 1)[1:-1]) + "]::FLOAT[]"
+        exprs = [e for c in numeric for e in (
+            f"count({fin[c]})", f"sum({fin[c]})", f"sum({fin[c]} * {fin[c]})", f"min({fin[c]})", f"max({fin[c]})",
+            f"approx_count_distinct({fin[c]})", f"approx_quantile({fin[c]}, {probs})",
+        )]
+        row = src.query("SELECT " + ", ".join(exprs) + " FROM src")[0]
+
+        # Columns with few distinct values are sketched from their exact value counts (same
+        # sketch as pandas). The rest bin on approximate quantile edges with exact min and
+        # max; DuckDB histogram bins are upper-inclusive like numeric_sketch, plus an overflow key.
+        hist: Dict[int, str] = {}
+        edges: Dict[int, np.ndarray] = {}
+        for j, c in enumerate(numeric):
+            cnt, s, ss, lo, hi, ndv, qs = row[7 * j: 7 * j + 7]
+            columns[c] = numeric_sketch(n, np.empty(0))
+            if not cnt:
+                continue
+            if ndv <= SKETCH_EXACT_DISTINCT:
+                hist[j] = f"histogram({fin[c]})"
+                continue
+            e = np.maximum.accumulate(np.clip(np.array([lo, *qs, hi], dtype=float), lo, hi))
+            edges[j] = e
+            hist[j] = f"histogram({fin[c]}, [{', '.join(repr(float(v)) for v in np.unique(e[1:-1]))}]::DOUBLE[])"
+            columns[c].update({
+                "missing": int(n - cnt), "sum": float(s), "sumsq": float(ss),
+                "min": float(lo), "max": float(hi), "edges": [float(v) for v in e],
+            })
+        if hist:
+            for j, h in zip(hist, src.query("SELECT " + ", ".join(hist.values()) + " FROM src")[0]):
+                c = numeric[j]
+                if j not in edges:
+                    values = np.array(sorted(h), dtype=float)
+                    columns[c] = numeric_sketch(n, values, np.array([h[v] for v in values.tolist()], dtype=float))
+                    continue
+                bins = np.zeros(SKETCH_BINS, dtype=np.int64)
+                inner = edges[j][1:-1]
+                for b, k in h.items():
+                    bins[SKETCH_BINS - 1 if np.isinf(b) else int(np.searchsorted(inner, b, side="left"))] += int(k)
+                columns[c]["bins"] = bins.tolist()
+
+    for c in categorical:
+        top = top_values(src, c, SKETCH_TOP_K)
+        missing = int(meta.get(c, {}).get("missing", 0))
+        columns[c] = {
+            "kind": "categorical",
+            "n": n,
+            "missing": missing,
+            "n_distinct": int(meta.get(c, {}).get("n_unique", len(top))),
+            "top": {str(k): v for k, v in top.items()},
+            "other": int(n - missing - sum(top.values())),
+        }
+
+    return {"version": SKETCH_VERSION, "n_rows": n, "schema": dict(src.dtypes), "columns": columns}
@@ -0,0 +1,631 @@
+from __future__ import annotations
+
+import math
+import os
+import sys
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.ingest import load_file, infer_schema as infer_schema_pandas
+from analysis.profiler import (
+    TEXT_SAMPLE_ROWS, column_roles as column_roles_pandas, basic_profile as basic_profile_pandas, is_text_like, measure_columns,
+)
+from analysis.packs.snapshot_pack import snapshot_from_stats, run_snapshot_pack as run_snapshot_pack_pandas
+from analysis.packs.categorical_pack import association_columns, categorical_associations, categorical_from_stats, run_categorical_pack as run_categorical_pack_pandas
+from analysis.packs.numeric_pack import HIST_BINS, MAX_MATRIX_COLS, TOP_CORR_PAIRS, run_numeric_pack as run_numeric_pack_pandas
+from analysis.packs.timeseries_pack import FREQS, hourly_from_table, timeseries_from_hourly, run_timeseries_pack as run_timeseries_pack_pandas
+from analysis.packs.outlier_pack import TOP_ROWS, run_outlier_pack as run_outlier_pack_pandas
+from analysis.packs.segment_pack import TOP_DEVIATIONS, group_label, segment_from_stats, segment_keys, run_segment_pack as run_segment_pack_pandas
+from analysis.packs.text_pack import N_FEATURES, TOP_TERMS, run_text_pack as run_text_pack_pandas
+from analysis.hypothesis_verify import verify_hypotheses as verify_hypotheses_pandas
+from analysis.drift import SKETCH_TOP_K, SKETCH_VERSION, build_sketch as build_sketch_pandas, numeric_sketches
+from analysis.backends.duckdb_backend import _json_safe_rows
+
+# 0 = Polars default (one thread per core); read once, when polars is first imported
+POLARS_THREADS = int(os.getenv("POLARS_THREADS", "0"))
+
+SUPPORTED_SUFFIXES = {".csv", ".parquet", ".jsonl", ".ndjson"}
+# rows used to infer CSV/JSONL column types before falling back to the whole file
+INFER_ROWS = 10_000
+
+# pandas.read_csv's default NA markers, so both backends agree on what is missing
+_PANDAS_NA_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+_TS = "__ts__"
+
+
+def _polars():
+    if POLARS_THREADS > 0:
+        os.environ.setdefault("POLARS_MAX_THREADS", str(POLARS_THREADS))
+    try:
+        import polars
+    except ImportError as e:
+        raise RuntimeError("The polars backend needs the `polars` package (pip install polars).") from e
+    return polars
+
+
+def _pandas_dtype(dtype: Any, has_nulls: bool) -> str:
+    """Maps Polars dtypes onto the dtype names pandas would give the same file."""
+    pl = _polars()
+    if dtype.is_integer():
+        # pandas has no missing-value integer by default: such columns load as float64
+        return "float64" if has_nulls else str(dtype).lower()
+    if dtype.is_float():
+        return str(dtype).lower()
+    if dtype == pl.Boolean:
+        return "object" if has_nulls else "bool"
+    if dtype == pl.Datetime or dtype == pl.Date:
+        return "datetime64[ns]"
+    if dtype == pl.Categorical or dtype == pl.Enum:
+        return "category"
+    return "object"
+
+
+def _nan_missing(d: pd.DataFrame, missing: Dict[str, int]) -> pd.DataFrame:
+    # arrow hands text nulls over as None; pandas-read frames hold NaN there
+    for c in d.columns:
+        if d[c].dtype == object and missing.get(c):
+            d[c] = d[c].where(d[c].notna(), np.nan)
+    return d
+
+
+class PolarsSource:
+    """
+    A data file as a Polars LazyFrame. Queries are lazy: each one reads only the
+    columns it projects (straight from the file for Parquet), aggregates column-wise
+    on all cores, and independent queries are batched with collect_all.
+    """
+
+    backend = "polars"
+
+    def __init__(self, file_path: str):
+        p = Path(file_path)
+        if not p.exists():
+            raise FileNotFoundError(file_path)
+        suffix = p.suffix.lower()
+        if suffix not in SUPPORTED_SUFFIXES:
+            raise ValueError(f"polars backend does not read {suffix} files")
+
+        pl = self.pl = _polars()
+        self.path = str(p)
+        if suffix == ".parquet":
+            lf = pl.scan_parquet(p)
+        else:
+            # text formats are parsed once into columnar memory: re-tokenizing the text
+            # per query would cost more than every aggregation together
+            lf = self._read_text(p, suffix).lazy()
+
+        # same normalization as analysis.ingest: drop auto-index columns from CSV exports
+        schema = lf.collect_schema()
+        keep = [c for c in schema.names() if not str(c).strip().lower().startswith("unnamed:") and c != ""]
+        floats = [c for c in keep if schema[c].is_float()]
+        # pandas counts NaN as missing; make it a null so every aggregate skips it
+        self.lf = lf.select(keep).with_columns([pl.col(c).fill_nan(None) for c in floats])
+
+        row = self.lf.select([pl.len().alias(_TS)] + [pl.col(c).null_count() for c in keep]).collect().row(0)
+        self.n_rows = int(row[0])
+        self.missing: Dict[str, int] = {c: int(v) for c, v in zip(keep, row[1:])}
+        self.pl_types: Dict[str, Any] = {c: schema[c] for c in keep}
+        self.dtypes: Dict[str, str] = {c: _pandas_dtype(schema[c], self.missing[c] > 0) for c in keep}
+        self.columns: List[str] = keep
+        # full-scan results reused across stages (schema, duplicate count)
+        self.cache: Dict[str, Any] = {}
+
+    def _read_text(self, p: Path, suffix: str):
+        """
+        Types come from the leading rows; a value that does not fit them (a float
+        after 10k ints, ...) fails the parse, which is then redone with types
+        inferred from the whole file, as pandas does.
+        """
+        pl = self.pl
+        for rows in (INFER_ROWS, None):
+            try:
+                if suffix == ".csv":
+                    # latin1 files decode lossily instead of failing
+                    return pl.read_csv(p, infer_schema_length=rows, null_values=_PANDAS_NA_VALUES, encoding="utf8-lossy")
+                return pl.read_ndjson(p, infer_schema_length=rows)
+            except pl.exceptions.ComputeError:
+                if rows is None:
+                    raise
+
+    def collect_all(self, queries: List[Any]) -> List[Any]:
+        return self.pl.collect_all(queries) if queries else []
+
+    def is_numeric(self, col: Any) -> bool:
+        return self.dtypes.get(col, "").startswith(("int", "uint", "float", "bool"))
+
+    def frame(self, columns: List[str]) -> pd.DataFrame:
+        """The given columns as a pandas DataFrame, dtyped as pandas would read them."""
+        d = self.lf.select(list(dict.fromkeys(columns))).collect().to_pandas()
+        return _nan_missing(d, self.missing)
+
+    def sample_df(self, k: int, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        k rows at the positions analysis.sampling.Sampler would pick (same seed), so
+        pandas-side stages see the same sample on either backend.
+        """
+        cols = columns or self.columns
+        if self.n_rows <= k:
+            return self.frame(cols)
+        pos = np.sort(np.random.default_rng(42).choice(self.n_rows, size=int(k), replace=False))
+        idx = self.pl.Series(pos.astype(np.uint32))
+        d = (
+            self.lf.select(list(dict.fromkeys(cols))).with_row_index(_TS)
+            .filter(self.pl.col(_TS).is_in(idx)).drop(_TS)
+            .collect().to_pandas()
+        )
+        return _nan_missing(d, self.missing)
+
+    def close(self) -> None:
+        self.cache.clear()
+
+
+# -------------------------
+# Ingest / profile
+# -------------------------
+def infer_schema(src: PolarsSource) -> Dict[str, Any]:
+    """Same shape as analysis.ingest.infer_schema (one scan for all columns)."""
+    if "schema" in src.cache:
+        return src.cache["schema"]
+    pl = src.pl
+    row = src.lf.select([pl.col(c).drop_nulls().n_unique() for c in src.columns]).collect().row(0) if src.columns else ()
+    cols = [
+        {"name": c, "dtype": src.dtypes[c], "missing": src.missing[c], "n_unique": int(row[i])}
+        for i, c in enumerate(src.columns)
+    ]
+    src.cache["schema"] = {"n_rows": src.n_rows, "n_cols": len(cols), "columns": cols}
+    return src.cache["schema"]
+
+
+def duplicate_rows(src: PolarsSource) -> int:
+    if "duplicates" not in src.cache:
+        distinct = src.lf.unique().select(src.pl.len()).collect().item()
+        src.cache["duplicates"] = int(src.n_rows - distinct)
+    return src.cache["duplicates"]
+
+
+def _top_query(src: PolarsSource, col: str, k: int):
+    # ties keep first-seen order; pandas leaves their order unspecified
+    return (
+        src.lf.select(col).drop_nulls()
+        .group_by(col, maintain_order=True).len()
+        .sort("len", descending=True, maintain_order=True)
+        .head(int(k))
+    )
+
+
+def top_values_many(src: PolarsSource, cols: List[str], k: int) -> Dict[str, Dict[Any, int]]:
+    frames = src.collect_all([_top_query(src, c, k) for c in cols])
+    return {c: dict(zip(f[c].to_list(), (int(n) for n in f["len"].to_list()))) for c, f in zip(cols, frames)}
+
+
+def column_roles(src: PolarsSource) -> Dict[str, List[str]]:
+    """Same rules as analysis.profiler.column_roles, evaluated on the full data."""
+    pl = src.pl
+    numeric = [c for c in src.columns if src.is_numeric(c)]
+    categorical = [c for c in src.columns if src.dtypes[c] in ("object", "category")]
+
+    datetime_cols = [c for c in src.columns if src.dtypes[c].startswith("datetime")]
+    text_cols = [c for c in src.columns if src.dtypes[c] == "object"]
+    heads = src.collect_all([src.lf.select(pl.col(c).drop_nulls().cast(pl.String).head(TEXT_SAMPLE_ROWS)) for c in text_cols])
+    free_text = []
+    for c, h in zip(text_cols, heads):
+        sample = pd.Series(h[c].to_list(), dtype=object)
+        if sample.empty:
+            continue
+        if pd.to_datetime(sample.head(50), errors="coerce").notna().mean() > 0.7:
+            datetime_cols.append(c)
+        elif is_text_like(sample):
+            free_text.append(c)
+    datetime_cols = [c for c in src.columns if c in set(datetime_cols)]
+    categorical = [c for c in categorical if c not in datetime_cols and c not in free_text]
+
+    schema = infer_schema(src)
+    n = src.n_rows
+    id_like = [
+        col["name"] for col in schema["columns"]
+        if n > 0 and col["n_unique"] > 20 and col["n_unique"] / max(n, 1) > 0.9
+    ]
+    return {"numeric": numeric, "categorical": categorical, "datetime": datetime_cols, "text": free_text, "id_like": id_like}
+
+
+def _describe(src: PolarsSource, cols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """pandas describe() for numeric columns: count, mean, std, min, quartiles (linear), max."""
+    pl = src.pl
+    stats = ("count", "mean", "std", "min", "25%", "50%", "75%", "max")
+    exprs = []
+    for i, c in enumerate(cols):
+        x = pl.col(c).cast(pl.Float64)
+        exprs += [
+            x.count().alias(f"{i}_0"), x.mean().alias(f"{i}_1"), x.std(ddof=1).alias(f"{i}_2"), x.min().alias(f"{i}_3"),
+            x.quantile(0.25, "linear").alias(f"{i}_4"), x.quantile(0.5, "linear").alias(f"{i}_5"),
+            x.quantile(0.75, "linear").alias(f"{i}_6"), x.max().alias(f"{i}_7"),
+        ]
+    row = src.lf.select(exprs).collect().row(0) if exprs else ()
+    return {
+        c: {k: (float(v) if v is not None else float("nan")) for k, v in zip(stats, row[8 * i: 8 * i + 8])}
+        for i, c in enumerate(cols)
+    }
+
+
+def basic_profile(src: PolarsSource, sample: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+    """
+    Same shape as analysis.profiler.basic_profile, all from the full data
+    (`sample` is accepted for signature parity with the duckdb backend).
+    """
+    roles = column_roles(src)
+    # pandas describe() leaves booleans out of a numeric summary
+    described = [c for c in roles["numeric"] if src.dtypes[c] != "bool"]
+    return {
+        "roles": roles,
+        "missing_total": int(sum(src.missing.values())),
+        "duplicates": duplicate_rows(src),
+        "top_categoricals": top_values_many(src, roles["categorical"][:8], 5),
+        "numeric_summary": _describe(src, described),
+    }
+
+
+# -------------------------
+# Packs (same dict shapes as analysis/packs)
+# -------------------------
+def run_snapshot_pack(src: PolarsSource) -> Dict[str, Any]:
+    missing = pd.Series(src.missing, dtype="int64").sort_values(ascending=False).head(20)
+    head = src.lf.head(5).collect().to_pandas()
+    head = _nan_missing(head, src.missing)
+    return snapshot_from_stats(
+        n_rows=src.n_rows,
+        n_cols=len(src.columns),
+        duplicate_rows=duplicate_rows(src),
+        sample_rows=_json_safe_rows(head),
+        missing=missing,
+    )
+
+
+def run_categorical_pack(
+    src: PolarsSource,
+    categorical_cols: List[str],
+    *,
+    top_k: int = 10,
+    max_cols: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Every column's top values in one parallel collect_all, so no time budget is needed."""
+    n_unique = {c["name"]: int(c["n_unique"]) for c in infer_schema(src)["columns"]}
+    cols = [c for c in categorical_cols if c in src.dtypes][:max_cols]
+    tops = top_values_many(src, cols, top_k)
+    stats = {c: {"top_values": tops[c], "n_unique": n_unique.get(c, 0), "n_valid": src.n_rows - int(src.missing[c])} for c in cols}
+    # a frame of the same length samples the same rows as the pandas pack
+    assoc_cols = association_columns(cols, n_unique)
+    associations = categorical_associations(src.frame(assoc_cols), assoc_cols, n_unique) if len(assoc_cols) >= 2 else []
+    return categorical_from_stats(src.n_rows, stats, top_k=top_k, associations=associations)
+
+
+def run_numeric_pack(
+    src: PolarsSource,
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_corr_cols: int = 12,
+    corr_sample_rows: int = 50000,
+    hist_sample_rows: int = 20000,
+    corr_cols: Optional[List[str]] = None,
+    hist_bins: int = HIST_BINS,
+    method: str = "pearson",
+    max_matrix_cols: int = MAX_MATRIX_COLS,
+    top_k: int = TOP_CORR_PAIRS,
+) -> Dict[str, Any]:
+    """
+    The numeric columns are collected (a columnar projection, no row parsing on the
+    pandas side) and handed to the pandas pack, whose correlation and histogram
+    kernels are already vectorized; its Sampler picks the same rows as on pandas.
+    """
+    cols = [c for c in numeric_cols if src.is_numeric(c)]
+    return run_numeric_pack_pandas(
+        src.frame(cols) if cols else pd.DataFrame(), cols, id_like,
+        max_corr_cols=max_corr_cols, corr_sample_rows=corr_sample_rows, hist_sample_rows=hist_sample_rows,
+        corr_cols=corr_cols, hist_bins=hist_bins, method=method, max_matrix_cols=max_matrix_cols, top_k=top_k,
+    )
+
+
+def _datetime_expr(src: PolarsSource, col: str):
+    """`col` as a timestamp; text is parsed with the format Polars infers (unparseable -> null)."""
+    pl = src.pl
+    dtype = src.pl_types[col]
+    if dtype == pl.Datetime or dtype == pl.Date:
+        return pl.col(col).cast(pl.Datetime("ns"))
+    return pl.col(col).cast(pl.String).str.to_datetime(strict=False, time_unit="ns")
+
+
+def _datetime_frame(src: PolarsSource, datetime_col: str, use_num: List[str]):
+    """Rows with a parseable timestamp in column _TS, plus the numeric columns as floats."""
+    pl = src.pl
+    nums = [pl.col(c).cast(pl.Float64) for c in use_num]
+    try:
+        d = src.lf.select(_datetime_expr(src, datetime_col).alias(_TS), *nums).drop_nulls(_TS).collect()
+        if d.height > 0 or src.missing[datetime_col] == src.n_rows:
+            return d
+    except Exception:
+        pass
+    # formats Polars cannot infer: parse the one column with pandas, aggregate in Polars
+    parsed = pd.to_datetime(src.frame([datetime_col])[datetime_col], errors="coerce")
+    d = src.lf.select(*nums).collect().with_columns(pl.Series(_TS, parsed.to_numpy(dtype="datetime64[ns]")))
+    return d.drop_nulls(_TS)
+
+
+def run_timeseries_pack(
+    src: PolarsSource,
+    datetime_col: str,
+    numeric_cols: List[str],
+    *,
+    freq: str = "D",
+    rolling_window: int = 7,
+) -> Dict[str, Any]:
+    pl = src.pl
+    out: Dict[str, Any] = {
+        "datetime_col": datetime_col,
+        "numeric_cols": numeric_cols[:5],
+        "insights": [],
+        "charts": [],
+    }
+    if datetime_col not in src.dtypes:
+        out["skipped"] = f"Datetime column '{datetime_col}' not found."
+        return out
+
+    use_num = [c for c in numeric_cols if src.is_numeric(c)]
+    d = _datetime_frame(src, datetime_col, use_num)
+    out["n_points"] = int(d.height)
+    if d.height == 0 or not numeric_cols:
+        out["skipped"] = "Not enough datetime rows or no numeric columns."
+        return out
+    if not use_num:
+        out["skipped"] = "No numeric columns found in dataframe."
+        return out
+
+    # hourly aggregates in one pass; the cube's coarser levels are rolled up from them
+    aggs = []
+    for i, c in enumerate(use_num):
+        v = pl.col(c).fill_nan(None)
+        aggs += [v.count().alias(f"n{i}"), v.sum().alias(f"s{i}"), v.min().alias(f"lo{i}"), v.max().alias(f"hi{i}")]
+    table = (
+        d.lazy().group_by((pl.col(_TS).dt.epoch("ms") // 3_600_000).alias("h"))
+        .agg([pl.len().alias("rows"), *aggs]).sort("h").collect()
+    )
+    hourly = hourly_from_table(table.to_numpy().astype(float))
+    return timeseries_from_hourly(out, hourly, use_num, freq=freq, rolling_window=rolling_window)
+
+
+def run_segment_pack(
+    src: PolarsSource,
+    categorical_cols: List[str],
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_keys: int = 3,
+    max_cardinality: int = 30,
+    max_cols: int = 8,
+    top_k: int = TOP_DEVIATIONS,
+) -> Dict[str, Any]:
+    """One group_by per key plus the overall aggregates, collected together."""
+    pl = src.pl
+    n_unique = {c["name"]: int(c["n_unique"]) for c in infer_schema(src)["columns"]}
+    keys = segment_keys([c for c in categorical_cols if c in src.dtypes], n_unique, id_like, max_keys=max_keys, max_cardinality=max_cardinality)
+    cols = measure_columns(
+        [c for c in numeric_cols if src.is_numeric(c) and c not in keys],
+        id_like, lambda c: src.pl_types[c].is_integer(), max_cols=max_cols,
+    )
+    if not keys or not cols:
+        return segment_from_stats(src.n_rows, {}, {}, top_k=top_k)
+
+    x = [pl.col(c).cast(pl.Float64) for c in cols]
+    group_aggs = [pl.len().alias(_TS)] + [e for i, v in enumerate(x) for e in (
+        v.count().alias(f"{_TS}c{i}"), v.mean().alias(f"{_TS}m{i}"), v.median().alias(f"{_TS}q{i}"))]
+    frames = src.collect_all(
+        [src.lf.select([k, *cols]).drop_nulls(k).group_by(k).agg(group_aggs) for k in keys]
+        + [src.lf.select([e for i, v in enumerate(x) for e in (
+            v.count().alias(f"c{i}"), v.mean().alias(f"m{i}"), v.median().alias(f"q{i}"), v.std().alias(f"s{i}"))])]
+    )
+
+    row = frames[-1].row(0)
+    overall = {c: dict(zip(("count", "mean", "median", "std"), row[4 * i: 4 * i + 4])) for i, c in enumerate(cols)}
+    segments = {}
+    for k, f in zip(keys, frames):
+        segments[k] = {
+            "n_unique": f.height,
+            "groups": [
+                {"value": group_label(r[0]), "rows": int(r[1]),
+                 "columns": {c: dict(zip(("count", "mean", "median"), r[2 + 3 * i: 5 + 3 * i])) for i, c in enumerate(cols)}}
+                for r in f.iter_rows()
+            ],
+        }
+    return segment_from_stats(src.n_rows, overall, segments, top_k=top_k)
+
+
+def run_outlier_pack(
+    src: PolarsSource,
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_cols: int = 12,
+    top_rows: int = TOP_ROWS,
+    multivariate: bool = True,
+    sample_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    The numeric columns are collected and handed to the pandas pack: its kernel is one
+    vectorized pass over the 2D array, and row numbers are file positions on both.
+    """
+    cols = [c for c in numeric_cols if src.is_numeric(c)]
+    return run_outlier_pack_pandas(
+        src.frame(cols) if cols else pd.DataFrame(), cols, id_like,
+        max_cols=max_cols, top_rows=top_rows, multivariate=multivariate, sample_rows=sample_rows,
+    )
+
+
+def run_text_pack(
+    src: PolarsSource,
+    text_cols: List[str],
+    *,
+    max_cols: int = 4,
+    top_k: int = TOP_TERMS,
+    n_features: int = N_FEATURES,
+    sample_rows: Optional[int] = None,
+) -> Dict[str, Any]:
+    """The text columns are collected and handed to the pandas pack; its Sampler picks the same rows as on pandas."""
+    cols = [c for c in text_cols if c in src.dtypes][:max_cols]
+    return run_text_pack_pandas(
+        src.frame(cols) if cols else pd.DataFrame(index=range(src.n_rows)), cols,
+        max_cols=max_cols, top_k=top_k, n_features=n_features, sample_rows=sample_rows,
+    )
+
+
+# -------------------------
+# Hypothesis verification / drift sketch
+# -------------------------
+def verify_hypotheses(src: PolarsSource, hypotheses: List[Dict[str, Any]], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Collects just the referenced columns and runs the pandas verifiers on them.
+    Text used only as a group key arrives categorical and text used only as a
+    trend's time axis arrives parsed, which spares pandas millions of Python strings.
+    """
+    pl = src.pl
+    hyps = [h for h in hypotheses if isinstance(h, dict)]
+    default_time = ((profile or {}).get("roles", {}) or {}).get("datetime", [])
+    times = {h.get("time") or (default_time[0] if default_time else None) for h in hyps if h.get("kind") == "trend"}
+    keys = {h.get("by") for h in hyps if h.get("kind") == "group_mean_diff"}
+    other = {h.get(k) for h in hyps for k in ("col", "x", "y")} | {h.get("time") for h in hyps if h.get("kind") != "trend"}
+    wanted = [h.get(k) for h in hyps for k in ("col", "x", "y", "by", "time")]
+    cols = [c for c in dict.fromkeys(wanted + sorted(times, key=str)) if c in src.dtypes]
+    if not cols:
+        return verify_hypotheses_pandas(pd.DataFrame(), hypotheses, profile)
+
+    exprs = []
+    for c in cols:
+        if src.dtypes[c] == "object" and c not in other and c in times:
+            exprs.append(_datetime_expr(src, c).alias(c))
+        elif src.dtypes[c] == "object" and c not in other and c in keys:
+            exprs.append(pl.col(c).cast(pl.Categorical))
+        else:
+            exprs.append(pl.col(c))
+    try:
+        d = _nan_missing(src.lf.select(exprs).collect().to_pandas(), src.missing)
+    except Exception:
+        # e.g. a time format Polars cannot infer: pandas parses it from the text
+        d = src.frame(cols)
+    return verify_hypotheses_pandas(d, hypotheses, profile)
+
+
+def build_sketch(src: PolarsSource, roles: Dict[str, List[str]]) -> Dict[str, Any]:
+    numeric = [c for c in roles.get("numeric", []) if src.is_numeric(c)]
+    categorical = [c for c in roles.get("categorical", []) if c in src.dtypes]
+    meta = {c["name"]: c for c in infer_schema(src)["columns"]}
+    n = src.n_rows
+
+    columns: Dict[str, Dict[str, Any]] = numeric_sketches(src.frame(numeric), numeric) if numeric else {}
+    tops = top_values_many(src, categorical, SKETCH_TOP_K)
+    for c in categorical:
+        missing = int(meta[c]["missing"])
+        columns[c] = {
+            "kind": "categorical",
+            "n": n,
+            "missing": missing,
+            "n_distinct": int(meta[c]["n_unique"]),
+            "top": {str(k): v for k, v in tops[c].items()},
+            "other": int(n - missing - sum(tops[c].values())),
+        }
+
+    return {"version": SKETCH_VERSION, "n_rows": n, "schema": dict(src.dtypes), "columns": columns}
+
+
+# -------------------------
+# Equivalence check: python -m analysis.backends.polars_backend <file> [<file> ...]
+# -------------------------
+_TOP_KEYS = ("top_values", "top", "top_categoricals")
+
+
+def _diff(a: Any, b: Any, path: str = "", *, rel: float = 1e-9) -> List[str]:
+    """
+    Structural differences between two outputs; floats compare with a relative
+    tolerance. Top-k tables compare by their counts: pandas value_counts orders
+    equal counts arbitrarily, so which tied value makes the cut is not defined.
+    """
+    parts = path.split(".")
+    if isinstance(a, dict) and isinstance(b, dict) and (parts[-1] in _TOP_KEYS or parts[-2:-1] == ["top_categoricals"]):
+        if not all(isinstance(v, dict) for v in a.values()):
+            return _diff(sorted(a.values()), sorted(b.values()), path, rel=rel)
+    if isinstance(a, dict) and isinstance(b, dict):
+        out = [f"{path}: keys {sorted(map(str, set(a) ^ set(b)))}"] if set(a) != set(b) else []
+        for k in a:
+            if k in b:
+                out += _diff(a[k], b[k], f"{path}.{k}", rel=rel)
+        return out
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        if len(a) != len(b):
+            return [f"{path}: length {len(a)} != {len(b)}"]
+        return [d for i, (x, y) in enumerate(zip(a, b)) for d in _diff(x, y, f"{path}[{i}]", rel=rel)]
+    if isinstance(a, (int, float, np.number)) and isinstance(b, (int, float, np.number)) and not isinstance(a, bool):
+        fa, fb = float(a), float(b)
+        if (math.isnan(fa) and math.isnan(fb)) or math.isclose(fa, fb, rel_tol=rel, abs_tol=1e-12):
+            return []
+        return [f"{path}: {a!r} != {b!r}"]
+    if a is None and isinstance(b, float) and math.isnan(b) or b is None and isinstance(a, float) and math.isnan(a):
+        return []
+    return [] if a == b or str(a) == str(b) else [f"{path}: {a!r} != {b!r}"]
+
+
+def check_equivalence(file_path: str) -> Dict[str, List[str]]:
+    """Runs each stage on both backends and returns the differences per stage."""
+    df = load_file(file_path)
+    src = PolarsSource(file_path)
+    roles = column_roles_pandas(df)
+    dt, num, cat = roles["datetime"], roles["numeric"], roles["categorical"]
+
+    hyps: List[Dict[str, Any]] = []
+    for c in cat[:1]:
+        hyps += [{"kind": "missingness", "col": c}, {"kind": "category_dominance", "col": c}]
+    if len(num) >= 2:
+        hyps.append({"kind": "correlation", "x": num[0], "y": num[1]})
+    for c in num[:1]:
+        hyps.append({"kind": "outlier_share", "col": c})
+        if cat:
+            hyps.append({"kind": "group_mean_diff", "col": c, "by": cat[0]})
+        if dt:
+            hyps.append({"kind": "trend", "col": c, "time": dt[0]})
+    prof = basic_profile_pandas(df)
+
+    stages = {
+        "infer_schema": (lambda: infer_schema_pandas(df), lambda: infer_schema(src)),
+        "column_roles": (lambda: roles, lambda: column_roles(src)),
+        "basic_profile": (lambda: prof, lambda: basic_profile(src)),
+        "snapshot": (lambda: run_snapshot_pack_pandas(df), lambda: run_snapshot_pack(src)),
+        "categorical": (lambda: run_categorical_pack_pandas(df, cat), lambda: run_categorical_pack(src, cat)),
+        "numeric": (lambda: run_numeric_pack_pandas(df, num, roles["id_like"]), lambda: run_numeric_pack(src, num, roles["id_like"])),
+        "outliers": (lambda: run_outlier_pack_pandas(df, num, roles["id_like"]), lambda: run_outlier_pack(src, num, roles["id_like"])),
+        "segment": (lambda: run_segment_pack_pandas(df, cat, num, roles["id_like"]), lambda: run_segment_pack(src, cat, num, roles["id_like"])),
+        "text": (lambda: run_text_pack_pandas(df, roles["text"]), lambda: run_text_pack(src, roles["text"])),
+        "verify": (lambda: verify_hypotheses_pandas(df, hyps, prof), lambda: verify_hypotheses(src, hyps, prof)),
+        "sketch": (lambda: build_sketch_pandas(df, roles), lambda: build_sketch(src, roles)),
+    }
+    if dt and num:
+        for f in FREQS:
+            stages[f"timeseries[{f}]"] = (
+                lambda f=f: run_timeseries_pack_pandas(df, dt[0], num, freq=f),
+                lambda f=f: run_timeseries_pack(src, dt[0], num, freq=f),
+            )
+    return {name: _diff(fa(), fb()) for name, (fa, fb) in stages.items()}
+
+
+if __name__ == "__main__":
+    warnings.simplefilter("ignore", UserWarning)  # pandas date-format inference chatter
+    failed = False
+    for path in sys.argv[1:]:
+        for stage, diffs in check_equivalence(path).items():
+            print(f"{path} {stage}: {'OK' if not diffs else f'{len(diffs)} difference(s)'}")
+            for d in diffs[:10]:
+                print(f"    {d}")
+            failed = failed or bool(diffs)
+    sys.exit(1 if failed else 0)
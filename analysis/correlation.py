@@ -0,0 +1,116 @@
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+
+METHODS = ("pearson", "spearman")
+
+
+def pairwise_pearson(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete Pearson correlation for a 2D float array with NaNs (rows x cols).
+    Each (i, j) entry uses only the rows where both columns are present, like
+    `DataFrame.corr()`, but is computed with a handful of matrix products.
+    Returns (corr, n_pairs); corr is NaN where a pair has < 2 rows or zero variance.
+    """
+    x = np.asarray(x, dtype=float)
+    m = (~np.isnan(x)).astype(float)
+    # centering on the column mean keeps the sum-of-products form numerically stable
+    center = np.nansum(x, axis=0) / np.maximum(m.sum(axis=0), 1.0)
+    xz = np.where(m > 0, x - center, 0.0)
+
+    n = m.T @ m                   # rows where both i and j are present
+    s = xz.T @ m                  # s[i, j] = sum of x_i over rows where j is present
+    ss = (xz * xz).T @ m          # same for x_i ** 2
+    cross = xz.T @ xz             # sum of x_i * x_j over shared rows
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = cross - s * s.T / n
+        var_i = ss - s * s / n
+        corr = cov / np.sqrt(var_i * var_i.T)
+
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+    return corr, n.astype(np.int64)
+
+
+def rank_columns(x: np.ndarray) -> np.ndarray:
+    """
+    Average ranks (1-based, ties share their mean rank) of each column's non-missing
+    values; NaN stays NaN. One sort per column.
+    """
+    x = np.asarray(x, dtype=float)
+    order = np.argsort(x, axis=0, kind="stable")        # NaN sorts last
+    ranks = np.full(x.shape, np.nan)
+    for j in range(x.shape[1]):
+        m = int((~np.isnan(x[:, j])).sum())
+        v = x[order[:m, j], j]
+        starts = np.flatnonzero(np.r_[True, v[1:] != v[:-1]]) if m else np.array([], dtype=np.int64)
+        ends = np.r_[starts[1:], m]
+        ranks[order[:m, j], j] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    return ranks
+
+
+def pairwise_corr(x: np.ndarray, method: str = "pearson") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    pairwise_pearson() of the raw values ("pearson") or of rank_columns() ("spearman").
+    Spearman ranks each column once over all its values, so with missing values it
+    differs slightly from `DataFrame.corr("spearman")`, which re-ranks every pair's
+    shared rows; without missing values the two agree.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method {method!r}; expected one of {METHODS}.")
+    return pairwise_pearson(rank_columns(x) if method == "spearman" else x)
+
+
+def cramers_v(codes: np.ndarray, n_levels: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete Cramér's V between categorical columns given as integer codes
+    (rows x cols, -1 = missing, column j in 0..n_levels[j]-1). Each pair is one
+    bincount of the joint codes into its contingency table.
+    Returns (v, n_pairs); v is NaN where either column has < 2 observed levels.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    k = codes.shape[1]
+    v = np.full((k, k), np.nan)
+    n = np.zeros((k, k), dtype=np.int64)
+    ok = codes >= 0
+    for i in range(k):
+        n[i, i] = int(ok[:, i].sum())
+        v[i, i] = 1.0 if len(np.unique(codes[ok[:, i], i])) >= 2 else np.nan
+        for j in range(i + 1, k):
+            both = ok[:, i] & ok[:, j]
+            a, b = codes[both, i], codes[both, j]
+            table = np.bincount(a * n_levels[j] + b, minlength=n_levels[i] * n_levels[j]).reshape(n_levels[i], n_levels[j])
+            table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+            n[i, j] = n[j, i] = total = int(table.sum())
+            r = min(table.shape) - 1
+            if r < 1:
+                continue
+            expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / total
+            chi2 = float(((table - expected) ** 2 / expected).sum())
+            v[i, j] = v[j, i] = min(1.0, float(np.sqrt(chi2 / total / r)))
+    return v, n
+
+
+def top_pairs(
+    corr: np.ndarray,
+    n_pairs: np.ndarray,
+    cols: Sequence[str],
+    *,
+    k: int = 10,
+    min_n: int = 2,
+) -> List[Dict[str, Any]]:
+    """
+    The k strongest off-diagonal pairs by |corr| (partition over the upper
+    triangle, ties to the earlier pair): [{"x", "y", "corr", "n"}], strongest first.
+    Pairs with fewer than `min_n` shared rows or a NaN coefficient are left out.
+    """
+    iu, ju = np.triu_indices(len(cols), k=1)
+    r = corr[iu, ju]
+    strength = np.where(np.isfinite(r) & (n_pairs[iu, ju] >= min_n), np.abs(r), -1.0)
+    k = min(k, int((strength >= 0).sum()))
+    if not k:
+        return []
+    cand = np.flatnonzero(strength >= np.partition(strength, -k)[-k])
+    top = cand[np.lexsort((cand, -strength[cand]))][:k]
+    return [{"x": cols[iu[t]], "y": cols[ju[t]], "corr": float(r[t]), "n": int(n_pairs[iu[t], ju[t]])} for t in top]
@@ -0,0 +1,151 @@
+from __future__ import annotations
+import math
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 1_000_000
+HEAVY_HITTER_LEVELS = 100_000   # more distinct values than this in the first chunk -> sketch
+SKETCH_COUNTERS = 1_000         # Misra-Gries counters per column
+HLL_P = 14                      # 2**14 HyperLogLog registers, ~0.8% distinct-count error
+
+
+def column_codes(s: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """(codes, uniques): a `category` column's own codes, else pd.factorize (first-seen order); -1 = missing."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(), s.cat.categories
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    return codes, pd.Index(uniques)
+
+
+def code_counts(s: pd.Series) -> Tuple[pd.Index, np.ndarray]:
+    """
+    (uniques, counts) of the non-missing values: the column becomes integer codes
+    once (column_codes) and is counted with np.bincount. Unused categories keep a
+    count of 0.
+    """
+    codes, uniques = column_codes(s)
+    return uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+
+def top_counts(uniques: pd.Index, counts: np.ndarray, k: int) -> Dict[Any, int]:
+    """The k largest counts ({value: count}, descending); ties keep code (first-seen) order."""
+    k = min(int(k), int((counts > 0).sum()))
+    if k <= 0:
+        return {}
+    cand = np.flatnonzero(counts >= max(np.partition(counts, -k)[-k], 1))
+    top = cand[np.lexsort((cand, -counts[cand]))][:k]
+    return {uniques[i]: int(counts[i]) for i in top}
+
+
+def _hll_update(registers: np.ndarray, s: pd.Series) -> None:
+    """Folds the non-missing values of `s` into HyperLogLog registers (in place)."""
+    h = pd.util.hash_pandas_object(s, index=False, categorize=False).to_numpy()
+    idx = (h >> np.uint64(64 - HLL_P)).astype(np.int64)
+    # rank = leading zeros of the remaining 64 - p bits, + 1; frexp gives the bit length exactly
+    _, bits = np.frexp((h & np.uint64((1 << (64 - HLL_P)) - 1)).astype(np.float64))
+    np.maximum.at(registers, idx, (64 - HLL_P + 1 - bits).astype(np.uint8))
+
+
+def _hll_estimate(registers: np.ndarray) -> int:
+    m = float(len(registers))
+    est = 0.7213 / (1 + 1.079 / m) * m * m / float(np.sum(np.exp2(-registers.astype(np.float64))))
+    zeros = int((registers == 0).sum())
+    if est <= 2.5 * m and zeros:
+        est = m * math.log(m / zeros)    # small-range correction (linear counting)
+    return int(round(est))
+
+
+def _misra_gries(counts: pd.Series, counters: int) -> pd.Series:
+    """Keeps the `counters` largest counts, each lowered by the next largest one."""
+    if len(counts) <= counters:
+        return counts
+    cut = np.partition(counts.to_numpy(), -(counters + 1))[-(counters + 1)]
+    return counts[counts > cut] - cut
+
+
+def column_counts(
+    s: pd.Series,
+    k: int,
+    *,
+    chunk_rows: int = CHUNK_ROWS,
+    max_levels: int = HEAVY_HITTER_LEVELS,
+    counters: int = SKETCH_COUNTERS,
+) -> Dict[str, Any]:
+    """
+    Top-k values, distinct count and non-missing count of one column.
+    Exact (one code_counts() pass) unless the first `chunk_rows` rows already hold
+    more than `max_levels` distinct values; then the column is read in chunks into a
+    Misra-Gries summary of `counters` values (every value above n / (counters + 1)
+    survives), whose candidates are recounted exactly in a second pass and listed
+    when above that bound, and the distinct count comes from HyperLogLog. Memory
+    stays bounded by the chunk.
+    Returns {"top_values", "n_unique", "n_valid"[, "approx"]}.
+    """
+    uniques, counts = code_counts(s.iloc[:chunk_rows])
+    if len(s) <= chunk_rows or len(uniques) <= max_levels:
+        if len(s) > chunk_rows:
+            uniques, counts = code_counts(s)
+        return {"top_values": top_counts(uniques, counts, k), "n_unique": int((counts > 0).sum()), "n_valid": int(counts.sum())}
+
+    summary = pd.Series(dtype=float)
+    registers = np.zeros(1 << HLL_P, dtype=np.uint8)
+    n_valid = 0
+    for start in range(0, len(s), chunk_rows):
+        if start:
+            uniques, counts = code_counts(s.iloc[start:start + chunk_rows])
+        seen = counts > 0
+        n_valid += int(counts.sum())
+        _hll_update(registers, pd.Series(uniques[seen]))   # distinct values only; HLL ignores repeats
+        # reduce the chunk to its own summary first, then merge the two (mergeable Misra-Gries)
+        summary = summary.add(_misra_gries(pd.Series(counts[seen], index=uniques[seen]), counters), fill_value=0)
+        summary = _misra_gries(summary, counters)
+
+    # only values above the sketch's error bound are certain to be among the true top-k
+    bound = n_valid // (counters + 1)
+    top = top_counts(*code_counts(s[s.isin(summary.index)]), k)
+    return {
+        "top_values": {v: n for v, n in top.items() if n > bound},
+        "n_unique": _hll_estimate(registers),
+        "n_valid": n_valid,
+        "approx": {"method": "misra-gries + hyperloglog", "counters": counters, "max_missed_count": bound},
+    }
+
+
+def stable_percentages(counts: List[int], total: int, *, decimals: int = 2) -> List[float]:
+    """
+    count / total as percentages rounded to `decimals` with the largest-remainder
+    method, so a distribution that covers `total` sums to exactly 100.
+    """
+    if total <= 0:
+        return [0.0] * len(counts)
+    unit = 10 ** decimals
+    raw = np.asarray(counts, dtype=float) * 100 * unit / total
+    base = np.floor(raw)
+    short = int(round(100 * unit - base.sum())) if int(np.sum(counts)) == total else 0
+    order = np.lexsort((np.arange(len(raw)), -(raw - base)))
+    base[order[:max(short, 0)]] += 1
+    return [float(v) / unit for v in base]
+
+
+def top_n_other(
+    top_values: Dict[Any, int],
+    n_valid: int,
+    *,
+    n_unique: Optional[int] = None,
+    approx: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Top values plus one "Other" row holding the rest of the non-missing values;
+    percentages are of `n_valid` (stable_percentages), so they do not move with top_k.
+    [{"value", "count", "pct", "other"}]
+    """
+    rows = [{"value": str(v), "count": int(n), "other": False} for v, n in top_values.items()]
+    rest = int(n_valid) - sum(r["count"] for r in rows)
+    if rest > 0:
+        n_rest = (n_unique - len(rows)) if n_unique is not None else None
+        label = f"Other ({'~' if approx else ''}{n_rest} values)" if n_rest and n_rest > 0 else "Other"
+        rows.append({"value": label, "count": rest, "other": True})
+    for r, p in zip(rows, stable_percentages([r["count"] for r in rows], int(n_valid))):
+        r["pct"] = p
+    return rows
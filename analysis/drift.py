@@ -0,0 +1,428 @@
+from __future__ import annotations
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+from analysis.counting import column_counts
+
+SKETCH_VERSION = 2           # 2: quantile bin edges ("edges"); 1: equal-width over [min, max]
+SKETCH_BINS = 128
+SKETCH_CHUNK_COLS = 64       # numeric columns sketched per block; bounds the working copy
+SKETCH_TOP_K = 50
+PSI_BINS = 10
+EPS = 1e-6
+
+# PSI rule of thumb: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+
+# -------------------------
+# Sketches: compact per-column summaries that drift is computed from
+# -------------------------
+def numeric_sketch(n: int, v: np.ndarray, weights: Optional[np.ndarray] = None) -> Dict[str, Any]:
+    """
+    Sketch of one column from its sorted finite values `v` (n = all rows, missing
+    included), or from its sorted distinct values and their counts in `weights`.
+    Bin edges are the SKETCH_BINS + 1 (linear) quantiles, so a few extreme values
+    cannot squeeze every other row into one bin; min and max are the outer edges.
+    Bin i holds edges[i] < x <= edges[i+1], the first bin also the minimum.
+    """
+    if weights is None:
+        total = len(v)
+        out = {"kind": "numeric", "n": int(n), "missing": int(n - total), "sum": float(v.sum()), "sumsq": float(np.dot(v, v))}
+    else:
+        w = np.asarray(weights, dtype=float)
+        cum = np.cumsum(w)
+        total = int(cum[-1]) if len(v) else 0
+        out = {"kind": "numeric", "n": int(n), "missing": int(n - total), "sum": float(np.dot(v, w)), "sumsq": float(np.dot(v * v, w))}
+    if not total:
+        out.update({"min": None, "max": None, "edges": None, "bins": [0] * SKETCH_BINS})
+        return out
+
+    # i-th smallest value (0-based) of the expanded column
+    def at(i: np.ndarray) -> np.ndarray:
+        return v[i.astype(np.int64)] if weights is None else v[np.searchsorted(cum, i, side="right")]
+
+    pos = np.linspace(0.0, 1.0, SKETCH_BINS + 1) * (total - 1)
+    below = np.floor(pos)
+    lo, hi = at(below), at(np.minimum(below + 1, total - 1))
+    edges = lo + (pos - below) * (hi - lo)
+    edges[0], edges[-1] = v[0], v[-1]
+
+    upto = np.searchsorted(v, edges[1:-1], side="right")
+    if weights is not None:
+        upto = np.where(upto > 0, cum[upto - 1], 0.0)
+    counts = np.diff(np.concatenate([[0.0], upto, [float(total)]]))
+    out.update({"min": float(v[0]), "max": float(v[-1]), "edges": [float(e) for e in edges], "bins": counts.astype(np.int64).tolist()})
+    return out
+
+
+def numeric_sketches(df: pd.DataFrame, cols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    numeric_sketch() of every column, SKETCH_CHUNK_COLS columns at a time: each block
+    is copied into one reused float buffer (a row per column) and sorted in place,
+    non-finite values as NaN sorting last, so memory stays at one block whatever the width.
+    """
+    n = len(df)
+    out: Dict[str, Dict[str, Any]] = {}
+    buf = np.empty((min(len(cols), SKETCH_CHUNK_COLS), n))
+    for start in range(0, len(cols), SKETCH_CHUNK_COLS):
+        block = cols[start:start + SKETCH_CHUNK_COLS]
+        x = buf[:len(block)]
+        for j, c in enumerate(block):
+            x[j] = df[c].to_numpy(dtype=float, na_value=np.nan)
+        x[~np.isfinite(x)] = np.nan
+        x.sort(axis=1)
+        n_valid = n - np.isnan(x).sum(axis=1)
+        for j, c in enumerate(block):
+            out[c] = numeric_sketch(n, x[j, :n_valid[j]])
+    return out
+
+
+def _categorical_sketch(s: pd.Series, top_k: int = SKETCH_TOP_K) -> Dict[str, Any]:
+    st = column_counts(s, top_k)
+    return {
+        "kind": "categorical",
+        "n": int(len(s)),
+        "missing": int(len(s) - st["n_valid"]),
+        "n_distinct": st["n_unique"],
+        "top": {str(k): int(v) for k, v in st["top_values"].items()},
+        "other": st["n_valid"] - sum(st["top_values"].values()),
+    }
+
+
+def build_sketch(df: pd.DataFrame, roles: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Per-column sketch of a dataset: histograms + moments for numeric columns,
+    top-k counts for categoricals. A few KB per column regardless of row count.
+    """
+    numeric = [c for c in roles.get("numeric", []) if c in df.columns]
+    categorical = [c for c in roles.get("categorical", []) if c in df.columns]
+
+    columns: Dict[str, Dict[str, Any]] = numeric_sketches(df, numeric)
+    for c in categorical:
+        columns[c] = _categorical_sketch(df[c])
+
+    return {
+        "version": SKETCH_VERSION,
+        "n_rows": int(len(df)),
+        "schema": {str(c): str(df[c].dtype) for c in df.columns},
+        "columns": columns,
+    }
+
+
+def _merge_numeric(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds two numeric sketches; histograms are re-binned onto the quantiles of the combined CDF."""
+    out = {
+        "kind": "numeric",
+        "n": a["n"] + b["n"],
+        "missing": a["missing"] + b["missing"],
+        "sum": a["sum"] + b["sum"],
+        "sumsq": a["sumsq"] + b["sumsq"],
+    }
+    parts = [s for s in (a, b) if s["min"] is not None]
+    if not parts:
+        out.update({"min": None, "max": None, "edges": None, "bins": [0] * SKETCH_BINS})
+        return out
+
+    # combined CDF on the union of both edge sets, then its quantiles as the new edges
+    grid = np.unique(np.concatenate([_edges(s) for s in parts]))
+    totals = [float(sum(s["bins"])) for s in parts]
+    cum_grid = sum(_cdf_at(*_hist_matrix([s]), grid[None, :])[0] * t for s, t in zip(parts, totals))
+    edges = np.interp(np.linspace(0.0, 1.0, SKETCH_BINS + 1) * sum(totals), cum_grid, grid)
+    edges[0], edges[-1] = grid[0], grid[-1]
+    cum = np.interp(edges, grid, cum_grid)
+    cum[0], cum[-1] = 0.0, sum(totals)   # the outer edges hold the minimum and maximum
+    counts = np.diff(cum)
+
+    # re-binning spreads counts fractionally; round while preserving the total
+    total = int(round(counts.sum()))
+    ints = np.floor(counts).astype(np.int64)
+    short = total - int(ints.sum())
+    if short > 0:
+        ints[np.argsort(-(counts - ints))[:short]] += 1
+    out.update({"min": float(grid[0]), "max": float(grid[-1]), "edges": [float(e) for e in edges], "bins": ints.tolist()})
+    return out
+
+
+def _merge_categorical(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds two categorical sketches; values that fall out of the merged top-k go to 'other'."""
+    counts: Dict[str, int] = dict(a["top"])
+    for k, v in b["top"].items():
+        counts[k] = counts.get(k, 0) + v
+    top = dict(sorted(counts.items(), key=lambda kv: -kv[1])[:SKETCH_TOP_K])
+    n = a["n"] + b["n"]
+    missing = a["missing"] + b["missing"]
+    return {
+        "kind": "categorical",
+        "n": n,
+        "missing": missing,
+        # distinct counts are not additive; the larger side is a lower bound
+        "n_distinct": max(a.get("n_distinct", 0), b.get("n_distinct", 0), len(counts)),
+        "top": top,
+        "other": int(n - missing - sum(top.values())),
+    }
+
+
+def merge_sketches(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combines two sketches as if they had been built from the concatenated data,
+    so a baseline can absorb new batches without the original rows.
+    Columns present on only one side are kept as-is.
+    """
+    cols_a = a.get("columns", {}) or {}
+    cols_b = b.get("columns", {}) or {}
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    for c in dict.fromkeys([*cols_a, *cols_b]):
+        ca, cb = cols_a.get(c), cols_b.get(c)
+        if ca is None or cb is None or ca["kind"] != cb["kind"]:
+            columns[c] = cb if cb is not None else ca
+        elif ca["kind"] == "numeric":
+            columns[c] = _merge_numeric(ca, cb)
+        else:
+            columns[c] = _merge_categorical(ca, cb)
+
+    return {
+        "version": SKETCH_VERSION,
+        "n_rows": int(a.get("n_rows", 0)) + int(b.get("n_rows", 0)),
+        "schema": {**(a.get("schema") or {}), **(b.get("schema") or {})},
+        "columns": columns,
+    }
+
+
+# -------------------------
+# Vectorized numeric drift
+# -------------------------
+def _edges(s: Dict[str, Any]) -> np.ndarray:
+    """Bin edges of a sketch; version-1 sketches have equal-width bins over [min, max]."""
+    if s.get("edges") is not None:
+        return np.asarray(s["edges"], dtype=float)
+    return np.linspace(s["min"], s["max"], len(s["bins"]) + 1)
+
+
+def _hist_matrix(cols: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stacks sketches into (bin edges, cumulative fraction at each edge)."""
+    edges = np.array([_edges(c) for c in cols], dtype=float)
+    counts = np.array([c["bins"] for c in cols], dtype=float)
+    total = np.maximum(counts.sum(axis=1, keepdims=True), 1.0)
+    cdf = np.concatenate([np.zeros((len(cols), 1)), np.cumsum(counts, axis=1) / total], axis=1)
+    return edges, cdf
+
+
+def _cdf_at(edges: np.ndarray, cdf: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Evaluates each row's histogram CDF at the points in q (rows x points), assuming
+    values are uniform within a bin. Constant columns step from 0 to 1 at their value.
+    """
+    out = np.empty(q.shape)
+    for r in range(len(edges)):
+        if edges[r, -1] > edges[r, 0]:
+            out[r] = np.interp(q[r], edges[r], cdf[r], left=0.0, right=1.0)
+        else:
+            out[r] = (q[r] >= edges[r, 0]).astype(float)
+    return out
+
+
+def _quantile_edges(edges: np.ndarray, cdf: np.ndarray, probs: np.ndarray) -> np.ndarray:
+    """Inverse CDF of each row's histogram at `probs` (linear within bins)."""
+    return np.array([np.interp(probs, cdf[r], edges[r]) for r in range(len(edges))])
+
+
+def _psi(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    p = np.maximum(p, EPS)
+    q = np.maximum(q, EPS)
+    return ((q - p) * np.log(q / p)).sum(axis=1)
+
+
+def _js(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Jensen-Shannon divergence (base 2, so 0..1) per row."""
+    m = (p + q) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_p = np.where(p > 0, p * np.log2(p / np.where(m > 0, m, 1.0)), 0.0).sum(axis=1)
+        kl_q = np.where(q > 0, q * np.log2(q / np.where(m > 0, m, 1.0)), 0.0).sum(axis=1)
+    return (kl_p + kl_q) / 2
+
+
+def _numeric_drift(a: List[Dict[str, Any]], b: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    edges_a, cdf_a = _hist_matrix(a)
+    edges_b, cdf_b = _hist_matrix(b)
+
+    # PSI on baseline (A) decile bins, shared by both sides
+    probs = np.linspace(0.0, 1.0, PSI_BINS + 1)[1:-1]
+    inner = _quantile_edges(edges_a, cdf_a, probs)
+    fa = _cdf_at(edges_a, cdf_a, inner)
+    fb = _cdf_at(edges_b, cdf_b, inner)
+    ones, zeros = np.ones((len(a), 1)), np.zeros((len(a), 1))
+    pa = np.diff(np.concatenate([zeros, fa, ones], axis=1), axis=1)
+    pb = np.diff(np.concatenate([zeros, fb, ones], axis=1), axis=1)
+    psi = _psi(pa, pb)
+
+    # KS: max CDF gap, checked at every bin edge of both histograms
+    grid = np.concatenate([edges_a, edges_b], axis=1)
+    ks = np.abs(_cdf_at(edges_a, cdf_a, grid) - _cdf_at(edges_b, cdf_b, grid)).max(axis=1)
+
+    def _mean(cols):
+        n = np.array([c["n"] - c["missing"] for c in cols], dtype=float)
+        s = np.array([c["sum"] for c in cols], dtype=float)
+        return np.where(n > 0, s / np.maximum(n, 1.0), np.nan)
+
+    return {"psi": psi, "ks": ks, "mean_a": _mean(a), "mean_b": _mean(b)}
+
+
+def _categorical_drift(a: List[Dict[str, Any]], b: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """PSI + JS over the union of both top-k lists plus one shared 'other' bucket."""
+    keys = [list(dict.fromkeys([*ca["top"], *cb["top"]])) for ca, cb in zip(a, b)]
+    width = max((len(k) for k in keys), default=0) + 1
+    pa = np.zeros((len(a), width))
+    pb = np.zeros((len(a), width))
+    for r, (ks, ca, cb) in enumerate(zip(keys, a, b)):
+        pa[r, :len(ks)] = [ca["top"].get(k, 0) for k in ks]
+        pb[r, :len(ks)] = [cb["top"].get(k, 0) for k in ks]
+        # values outside one side's top-k are folded into that side's "other"
+        pa[r, -1] = ca["n"] - ca["missing"] - pa[r, :len(ks)].sum()
+        pb[r, -1] = cb["n"] - cb["missing"] - pb[r, :len(ks)].sum()
+    pa = np.maximum(pa, 0.0)
+    pb = np.maximum(pb, 0.0)
+    pa /= np.maximum(pa.sum(axis=1, keepdims=True), 1.0)
+    pb /= np.maximum(pb.sum(axis=1, keepdims=True), 1.0)
+
+    # padding columns are zero on both sides, so they contribute nothing
+    used = (pa > 0) | (pb > 0)
+    psi = np.where(used, (np.maximum(pb, EPS) - np.maximum(pa, EPS)) * np.log(np.maximum(pb, EPS) / np.maximum(pa, EPS)), 0.0).sum(axis=1)
+    return {"psi": psi, "js": _js(pa, pb)}
+
+
+def _status(psi: float) -> str:
+    if not np.isfinite(psi):
+        return "unknown"
+    if psi >= PSI_MAJOR:
+        return "major"
+    if psi >= PSI_MODERATE:
+        return "moderate"
+    return "stable"
+
+
+def _num(v: Any) -> Optional[float]:
+    return float(v) if v is not None and np.isfinite(v) else None
+
+
+def compare_sketches(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Column-level drift of B against baseline A, from sketches only.
+    Numeric columns: PSI on A's decile bins, KS statistic, mean shift.
+    Categorical columns: PSI and Jensen-Shannon divergence over top-k + other.
+    All columns: missing-rate delta. Sorted by PSI, largest first.
+    """
+    cols_a = (a or {}).get("columns", {}) or {}
+    cols_b = (b or {}).get("columns", {}) or {}
+
+    shared = [c for c in cols_a if c in cols_b and cols_a[c]["kind"] == cols_b[c]["kind"]]
+    numeric = [c for c in shared if cols_a[c]["kind"] == "numeric" and cols_a[c]["min"] is not None and cols_b[c]["min"] is not None]
+    categorical = [c for c in shared if cols_a[c]["kind"] == "categorical"]
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    for c in shared:
+        sa, sb = cols_a[c], cols_b[c]
+        ra = sa["missing"] / sa["n"] if sa["n"] else 0.0
+        rb = sb["missing"] / sb["n"] if sb["n"] else 0.0
+        rows[c] = {
+            "column": c,
+            "kind": sa["kind"],
+            "psi": None,
+            "ks": None,
+            "js": None,
+            "missing_rate_a": float(ra),
+            "missing_rate_b": float(rb),
+            "missing_delta": float(rb - ra),
+        }
+
+    if numeric:
+        d = _numeric_drift([cols_a[c] for c in numeric], [cols_b[c] for c in numeric])
+        for j, c in enumerate(numeric):
+            rows[c].update({
+                "psi": _num(d["psi"][j]),
+                "ks": _num(d["ks"][j]),
+                "mean_a": _num(d["mean_a"][j]),
+                "mean_b": _num(d["mean_b"][j]),
+            })
+
+    if categorical:
+        d = _categorical_drift([cols_a[c] for c in categorical], [cols_b[c] for c in categorical])
+        for j, c in enumerate(categorical):
+            rows[c].update({"psi": _num(d["psi"][j]), "js": _num(d["js"][j])})
+
+    out = list(rows.values())
+    for r in out:
+        r["status"] = _status(r["psi"] if r["psi"] is not None else float("nan"))
+    out.sort(key=lambda r: -(r["psi"] if r["psi"] is not None else -1.0))
+
+    return {
+        "columns": out,
+        "summary": {
+            "n_compared": len(out),
+            "n_major": sum(r["status"] == "major" for r in out),
+            "n_moderate": sum(r["status"] == "moderate" for r in out),
+            "only_in_a": [c for c in cols_a if c not in cols_b],
+            "only_in_b": [c for c in cols_b if c not in cols_a],
+            "kind_mismatch": [c for c in cols_a if c in cols_b and cols_a[c]["kind"] != cols_b[c]["kind"]],
+        },
+    }
+
+
+# -------------------------
+# Outlier regression check: python -m analysis.drift
+# -------------------------
+def check_outlier_drift(build=build_sketch, n: int = 20_000, seed: int = 0) -> List[str]:
+    """
+    One column shifted by one standard deviation, with a single 1e9 value in the
+    shifted side. The sketch KS must track the exact two-sample KS (about 0.38)
+    and the column must not read as stable. `build(df, roles)` builds a sketch.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.normal(0.0, 1.0, n)
+    b = rng.normal(1.0, 1.0, n)
+    b[0] = 1e9
+    roles = {"numeric": ["x"], "categorical": []}
+    row = compare_sketches(build(pd.DataFrame({"x": a}), roles), build(pd.DataFrame({"x": b}), roles))["columns"][0]
+
+    grid = np.sort(np.concatenate([a, b]))
+    exact = float(np.abs(np.searchsorted(np.sort(a), grid, side="right") / n - np.searchsorted(np.sort(b), grid, side="right") / n).max())
+    out = []
+    if row["ks"] is None or abs(row["ks"] - exact) > 0.02:
+        out.append(f"ks {row['ks']!r} vs exact {exact:.4f}")
+    if row["status"] == "stable":
+        out.append(f"status stable (psi {row['psi']!r})")
+    return out
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    builders = {"pandas": build_sketch}
+    try:
+        from analysis.backends.duckdb_backend import DuckDBSource, build_sketch as build_sketch_duckdb
+
+        def _duckdb_build(df: pd.DataFrame, roles: Dict[str, List[str]]) -> Dict[str, Any]:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "x.parquet")
+                df.to_parquet(path, index=False)
+                src = DuckDBSource(path)
+                try:
+                    return build_sketch_duckdb(src, roles)
+                finally:
+                    src.con.close()
+
+        builders["duckdb"] = _duckdb_build
+    except ImportError:
+        pass
+
+    failed = False
+    for name, build in builders.items():
+        diffs = check_outlier_drift(build)
+        print(f"outlier drift [{name}]: {'OK' if not diffs else '; '.join(diffs)}")
+        failed = failed or bool(diffs)
+    sys.exit(1 if failed else 0)
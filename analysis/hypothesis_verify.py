@@ -1,44 +1,285 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+import inspect
+import math
+from collections import defaultdict
+from typing import Dict, Any, List, Callable, Optional
+import numpy as np
 import pandas as pd
 
-def verify_hypotheses(df: pd.DataFrame, hypotheses: List[Dict[str, Any]], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+from analysis.correlation import pairwise_pearson
+from analysis.outliers import IQR_K, robust_outliers
+from analysis.sampling import Sampler
+
+MAX_HYPOTHESES = 10
+MIN_PAIRS = 10
+MIN_GROUP_SIZE = 5
+
+
+def _p_two_sided(t: float) -> float:
+    """Normal approximation of a two-sided p-value (fine for the n >= 30 we usually see)."""
+    if not np.isfinite(t):
+        return float("nan")
+    return float(math.erfc(abs(t) / math.sqrt(2.0)))
+
+
+def _numeric_cols(df: pd.DataFrame, cols: List[str]) -> List[str]:
+    return [c for c in dict.fromkeys(cols) if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+
+
+def _not_found(payload: Dict[str, Any], *cols: Any) -> None:
+    payload["verify_error"] = f"column(s) not found or not usable: {', '.join(str(c) for c in cols)}"
+
+
+def group_diff_evidence(g: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    Evidence for a group_mean_diff hypothesis from per-group stats
+    (index = group, columns count/mean/var). None when < 2 groups are large enough.
+    """
+    g = g[g["count"] >= MIN_GROUP_SIZE]
+    if len(g) < 2:
+        return None
+    hi, lo = g["mean"].idxmax(), g["mean"].idxmin()
+    a, b = g.loc[hi], g.loc[lo]
+    se = math.sqrt(a["var"] / a["count"] + b["var"] / b["count"])
+    t = (a["mean"] - b["mean"]) / se if se > 0 else float("inf")
+
+    # eta squared: share of variance explained by the grouping
+    total_n = g["count"].sum()
+    grand = (g["mean"] * g["count"]).sum() / total_n
+    ss_between = (g["count"] * (g["mean"] - grand) ** 2).sum()
+    ss_within = ((g["count"] - 1) * g["var"].fillna(0.0)).sum()
+    eta_sq = ss_between / (ss_between + ss_within) if (ss_between + ss_within) > 0 else 0.0
+
+    return {
+        "highest_group": str(hi),
+        "highest_mean": float(a["mean"]),
+        "lowest_group": str(lo),
+        "lowest_mean": float(b["mean"]),
+        "mean_diff": float(a["mean"] - b["mean"]),
+        "welch_t": float(t),
+        "p_value_approx": _p_two_sided(t),
+        "eta_squared": float(eta_sq),
+        "n_groups": int(len(g)),
+        "n": int(total_n),
+    }
+
+
+def trend_evidence(time_col: str, r: float, slope: float, n: int) -> Dict[str, Any]:
+    t = r * math.sqrt((n - 2) / max(1e-12, 1 - r * r))
+    return {
+        "time_col": time_col,
+        "slope_per_day": float(slope),
+        "pearson_r": float(r),
+        "p_value_approx": _p_two_sided(t),
+        "direction": "increasing" if slope > 0 else "decreasing" if slope < 0 else "flat",
+        "n": int(n),
+    }
+
+
+def outlier_evidence(n_out: int, n_valid: int, lo: float, hi: float) -> Dict[str, Any]:
+    return {
+        "outlier_share": float(n_out / n_valid),
+        "n_outliers": int(n_out),
+        "lower_fence": float(lo),
+        "upper_fence": float(hi),
+        "method": f"IQR x{IQR_K}",
+        "n": int(n_valid),
+    }
+
+
+# -------------------------
+# Batch verifiers: one pass over the data per kind
+# -------------------------
+def _verify_missingness(df, hyps, payloads, profile) -> None:
+    cols = [h.get("col") for h in hyps if h.get("col") in df.columns]
+    rates = df[list(dict.fromkeys(cols))].isna().mean() if cols else pd.Series(dtype=float)
+    for h, payload in zip(hyps, payloads):
+        col = h.get("col")
+        if col in rates.index:
+            payload["verified"] = True
+            payload["evidence"] = {"missing_rate": float(rates[col])}
+
+
+def _verify_category_dominance(df, hyps, payloads, profile) -> None:
+    cols = list(dict.fromkeys(h.get("col") for h in hyps if h.get("col") in df.columns))
+    non_null = df[cols].notna().sum() if cols else pd.Series(dtype=int)
+
+    # profile already holds the top counts of the leading categoricals
+    cached = (profile or {}).get("top_categoricals", {}) or {}
+    tops: Dict[str, tuple] = {}
+    for col in cols:
+        top = cached.get(col)
+        if isinstance(top, dict) and top:
+            value, count = next(iter(top.items()))
+        else:
+            vc = df[col].value_counts(dropna=True)
+            if len(vc) == 0:
+                continue
+            value, count = vc.index[0], vc.iloc[0]
+        tops[col] = (value, int(count))
+
+    for h, payload in zip(hyps, payloads):
+        col = h.get("col")
+        if col not in tops:
+            continue
+        value, count = tops[col]
+        payload["verified"] = True
+        payload["evidence"] = {"top_value": str(value), "top_share": float(count / max(int(non_null[col]), 1))}
+
+
+def _verify_correlation(df, hyps, payloads, profile, sampler: Optional[Sampler] = None) -> None:
+    cols = _numeric_cols(df, [c for h in hyps for c in (h.get("x"), h.get("y"))])
+    if not cols:
+        for h, payload in zip(hyps, payloads):
+            _not_found(payload, h.get("x"), h.get("y"))
+        return
+
+    # full-data matrix; the numeric pack's cached one is reused when it ran on every row
+    if sampler is not None and sampler.df is df:
+        corr, n, _ = sampler.correlation(cols, budget=len(df))
+    else:
+        corr, n = pairwise_pearson(df[cols].to_numpy(dtype=float, na_value=np.nan))
+    pos = {c: i for i, c in enumerate(cols)}
+
+    for h, payload in zip(hyps, payloads):
+        x, y = h.get("x"), h.get("y")
+        if x not in pos or y not in pos:
+            _not_found(payload, x, y)
+            continue
+        i, j = pos[x], pos[y]
+        n_ij = int(n[i, j])
+        if n_ij < MIN_PAIRS or not np.isfinite(corr[i, j]):
+            continue
+        payload["verified"] = True
+        payload["evidence"] = {"pearson_corr": float(corr[i, j]), "n": n_ij}
+
+
+def _verify_group_mean_diff(df, hyps, payloads, profile) -> None:
+    by_key: Dict[str, List[int]] = defaultdict(list)
+    for k, h in enumerate(hyps):
+        by_key[h.get("by")].append(k)
+
+    for by, idxs in by_key.items():
+        cols = _numeric_cols(df, [hyps[k].get("col") for k in idxs])
+        if by not in df.columns or not cols:
+            for k in idxs:
+                _not_found(payloads[k], hyps[k].get("col"), by)
+            continue
+
+        # one groupby pass for every measure compared across this key
+        agg = df.groupby(by, observed=True, dropna=True)[cols].agg(["count", "mean", "var"])
+        for k in idxs:
+            col = hyps[k].get("col")
+            if col not in cols:
+                _not_found(payloads[k], col, by)
+                continue
+            evidence = group_diff_evidence(agg[col])
+            if evidence is not None:
+                payloads[k]["verified"] = True
+                payloads[k]["evidence"] = evidence
+
+
+def _verify_trend(df, hyps, payloads, profile) -> None:
+    default_time = ((profile or {}).get("roles", {}) or {}).get("datetime", [None])
+    by_time: Dict[str, List[int]] = defaultdict(list)
+    for k, h in enumerate(hyps):
+        by_time[h.get("time") or (default_time[0] if default_time else None)].append(k)
+
+    for time_col, idxs in by_time.items():
+        cols = _numeric_cols(df, [hyps[k].get("col") for k in idxs])
+        if time_col not in df.columns or not cols:
+            for k in idxs:
+                _not_found(payloads[k], hyps[k].get("col"), time_col)
+            continue
+
+        ts = pd.to_datetime(df[time_col], errors="coerce")
+        days = (ts - ts.min()).dt.total_seconds().to_numpy(dtype=float, na_value=np.nan) / 86400.0
+
+        # time is column 0, every requested measure shares the same pass
+        x = np.column_stack([days, df[cols].to_numpy(dtype=float, na_value=np.nan)])
+        corr, n = pairwise_pearson(x)
+        valid = ~np.isnan(x)
+        for k in idxs:
+            col = hyps[k].get("col")
+            if col not in cols:
+                _not_found(payloads[k], col, time_col)
+                continue
+            j = cols.index(col) + 1
+            n_j, r = int(n[0, j]), corr[0, j]
+            if n_j < MIN_PAIRS or not np.isfinite(r):
+                continue
+            both = valid[:, 0] & valid[:, j]
+            slope = r * np.std(x[both, j]) / np.std(x[both, 0]) if np.std(x[both, 0]) > 0 else 0.0
+            payloads[k]["verified"] = True
+            payloads[k]["evidence"] = trend_evidence(time_col, r, slope, n_j)
+
+
+def _verify_outlier_share(df, hyps, payloads, profile) -> None:
+    cols = _numeric_cols(df, [h.get("col") for h in hyps])
+    if cols:
+        # same kernel as the outlier pack, so both report the same fences and counts
+        st = robust_outliers(df[cols].to_numpy(dtype=float, na_value=np.nan), mad=False)
+        lo, hi, n_valid, n_out = st["lo"], st["hi"], st["n"], st["n_iqr"]
+
+    for h, payload in zip(hyps, payloads):
+        col = h.get("col")
+        if col not in cols:
+            _not_found(payload, col)
+            continue
+        j = cols.index(col)
+        if n_valid[j] == 0:
+            continue
+        payload["verified"] = True
+        payload["evidence"] = outlier_evidence(n_out[j], n_valid[j], lo[j], hi[j])
+
+
+_VERIFIERS: Dict[str, Callable[..., None]] = {
+    "missingness": _verify_missingness,
+    "category_dominance": _verify_category_dominance,
+    "correlation": _verify_correlation,
+    "group_mean_diff": _verify_group_mean_diff,
+    "trend": _verify_trend,
+    "outlier_share": _verify_outlier_share,
+}
+
+
+def verify_hypotheses(
+    df: pd.DataFrame,
+    hypotheses: List[Dict[str, Any]],
+    profile: Dict[str, Any],
+    *,
+    verifiers: Optional[Dict[str, Callable[..., None]]] = None,
+    sampler: Optional[Sampler] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Verifies hypotheses grouped by kind, so each kind costs one pass over the data
+    (one isna().mean(), one correlation matrix, one groupby per key, ...) rather than
+    one pass per hypothesis. Output order matches the input order.
+    `verifiers` swaps in another backend's per-kind verifiers (`df` is passed through).
+    `sampler` (the dataset's Sampler) goes to the verifiers that take one, so they
+    can reuse matrices the packs already computed.
+    """
+    verifiers = _VERIFIERS if verifiers is None else verifiers
+    hyps = [h for h in hypotheses[:MAX_HYPOTHESES] if isinstance(h, dict)]
     verified: List[Dict[str, Any]] = []
+    by_kind: Dict[Any, List[int]] = defaultdict(list)
 
-    for h in hypotheses[:10]:
-        kind = h.get("kind")
+    for i, h in enumerate(hyps):
         payload = dict(h)
         payload["verified"] = False
         payload["evidence"] = None
+        verified.append(payload)
+        by_kind[h.get("kind")].append(i)
 
+    for kind, idxs in by_kind.items():
+        fn = verifiers.get(kind)
+        if fn is None:
+            continue
+        kwargs = {"sampler": sampler} if sampler is not None and "sampler" in inspect.signature(fn).parameters else {}
         try:
-            if kind == "missingness":
-                col = h.get("col")
-                if col in df.columns:
-                    payload["verified"] = True
-                    payload["evidence"] = {"missing_rate": float(df[col].isna().mean())}
-
-            elif kind == "category_dominance":
-                col = h.get("col")
-                if col in df.columns:
-                    vc = df[col].value_counts(dropna=True)
-                    if len(vc) > 0:
-                        top_share = float(vc.iloc[0] / max(vc.sum(), 1))
-                        payload["verified"] = True
-                        payload["evidence"] = {"top_value": str(vc.index[0]), "top_share": top_share}
-
-            elif kind == "correlation":
-                x, y = h.get("x"), h.get("y")
-                if x in df.columns and y in df.columns:
-                    sub = df[[x, y]].dropna()
-                    if len(sub) >= 10:
-                        corr = float(sub[x].corr(sub[y]))
-                        payload["verified"] = True
-                        payload["evidence"] = {"pearson_corr": corr, "n": int(len(sub))}
-
+            fn(df, [hyps[i] for i in idxs], [verified[i] for i in idxs], profile, **kwargs)
         except Exception as e:
-            payload["verify_error"] = str(e)
-
-        verified.append(payload)
+            for i in idxs:
+                verified[i]["verify_error"] = str(e)
 
     return verified
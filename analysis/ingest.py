@@ -56,6 +56,36 @@ def load_file(file_path: str) -> pd.DataFrame:
     raise ValueError(f"Unsupported file type: {suffix}")
 
 
+def load_head(file_path: str, n_rows: int) -> pd.DataFrame:
+    """First `n_rows` rows only (progressive preview); reads no further into the file than needed."""
+    p = Path(file_path)
+    if not p.exists():
+        raise FileNotFoundError(file_path)
+
+    suffix = p.suffix.lower()
+    if suffix == ".csv":
+        try:
+            df = pd.read_csv(p, nrows=n_rows)
+        except UnicodeDecodeError:
+            df = pd.read_csv(p, nrows=n_rows, encoding="latin1")
+    elif suffix in (".xlsx", ".xls"):
+        df = pd.read_excel(p, nrows=n_rows)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        batch = next(pq.ParquetFile(p).iter_batches(batch_size=n_rows), None)
+        df = batch.to_pandas() if batch is not None else pd.read_parquet(p)
+    elif suffix in (".jsonl", ".ndjson"):
+        try:
+            df = pd.read_json(p, lines=True, nrows=n_rows)
+        except ValueError:
+            df = pd.read_json(p).head(n_rows)
+    else:
+        raise ValueError(f"Unsupported file type: {suffix}")
+
+    return _postprocess_df(df)
+
+
 def _postprocess_df(df: pd.DataFrame) -> pd.DataFrame:
     """
     Normalize common upload issues:
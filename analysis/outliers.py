@@ -0,0 +1,116 @@
+from __future__ import annotations
+import math
+import warnings
+from typing import Dict, Optional
+import numpy as np
+
+IQR_K = 1.5
+MAD_Z = 3.5          # modified z-score cut (Iglewicz & Hoaglin)
+MAD_C = 0.6745       # MAD -> sigma for normal data
+
+
+def robust_outliers(x: np.ndarray, *, mad: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Per-column robust statistics and outlier counts for a 2D float array with NaNs
+    (rows x cols), every column at once: quartiles and IQR fences (linear
+    interpolation, like `DataFrame.quantile`), and with `mad` the median absolute
+    deviation and the count of |modified z| > MAD_Z.
+    Returns {"n", "q1", "median", "q3", "lo", "hi", "n_iqr"[, "mad", "n_mad"]}, arrays of length cols.
+    """
+    x = np.asarray(x, dtype=float)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN columns
+        q1, med, q3 = np.nanquantile(x, [0.25, 0.5, 0.75], axis=0)
+    iqr = q3 - q1
+    lo, hi = q1 - IQR_K * iqr, q3 + IQR_K * iqr
+    out = {
+        "n": (~np.isnan(x)).sum(axis=0),
+        "q1": q1, "median": med, "q3": q3, "lo": lo, "hi": hi,
+        "n_iqr": ((x < lo) | (x > hi)).sum(axis=0),
+    }
+    if mad:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            out["mad"] = np.nanmedian(np.abs(x - med), axis=0)
+        out["n_mad"] = (np.abs(modified_z(x, med, out["mad"])) > MAD_Z).sum(axis=0)
+    return out
+
+
+def modified_z(x: np.ndarray, median: np.ndarray, mad: np.ndarray) -> np.ndarray:
+    """MAD_C * (x - median) / MAD; NaN where the MAD is 0 (over half the values tie)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return MAD_C * (x - median) / np.where(mad > 0, mad, np.nan)
+
+
+# -------------------------
+# Isolation forest (numpy): multivariate outlier score on a bounded sample
+# -------------------------
+def _avg_path(n: np.ndarray) -> np.ndarray:
+    """Average path length of an unsuccessful BST search over n points, c(n)."""
+    n = np.asarray(n, dtype=float)
+    h = np.log(np.maximum(n - 1, 1)) + 0.5772156649
+    return np.where(n > 2, 2 * h - 2 * (n - 1) / np.maximum(n, 1), np.where(n == 2, 1.0, 0.0))
+
+
+def _grow(x: np.ndarray, rng: np.random.Generator, max_depth: int):
+    """One isolation tree as flat arrays (feature, threshold, left, right, size); -1 feature = leaf."""
+    feat, thr, left, right, size = [], [], [], [], []
+    stack = [(np.arange(len(x)), 0, -1, False)]
+    while stack:
+        idx, depth, parent, is_right = stack.pop()
+        node = len(feat)
+        if parent >= 0:
+            (right if is_right else left)[parent] = node
+        feat.append(-1); thr.append(0.0); left.append(-1); right.append(-1); size.append(len(idx))
+        if depth >= max_depth or len(idx) <= 1:
+            continue
+        lo, hi = x[idx].min(axis=0), x[idx].max(axis=0)
+        cand = np.flatnonzero(hi > lo)
+        if not len(cand):
+            continue
+        f = int(rng.choice(cand))
+        t = float(rng.uniform(lo[f], hi[f]))
+        feat[node], thr[node] = f, t
+        go_left = x[idx, f] < t
+        stack.append((idx[~go_left], depth + 1, node, True))
+        stack.append((idx[go_left], depth + 1, node, False))
+    return np.array(feat), np.array(thr), np.array(left), np.array(right), np.array(size)
+
+
+def isolation_scores(
+    x: np.ndarray,
+    *,
+    n_trees: int = 100,
+    subsample: int = 256,
+    seed: int = 42,
+    fit_rows: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Isolation-forest anomaly score in (0, 1] for each row of a NaN-free 2D array
+    (~0.5 ordinary, towards 1 isolated early = anomalous). Trees are grown on
+    `subsample`-row draws (from `fit_rows` if given); scoring walks every row down a
+    tree one level at a time, so the cost is O(n_trees x rows x log2(subsample)).
+    """
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    rng = np.random.default_rng(seed)
+    pool = np.arange(n) if fit_rows is None else np.asarray(fit_rows)
+    psi = int(min(subsample, len(pool)))
+    if n == 0 or psi < 2:
+        return np.full(n, np.nan)
+    max_depth = int(math.ceil(math.log2(psi)))
+
+    depth_sum = np.zeros(n)
+    rows = np.arange(n)
+    for _ in range(n_trees):
+        feat, thr, left, right, size = _grow(x[rng.choice(pool, size=psi, replace=False)], rng, max_depth)
+        node = np.zeros(n, dtype=np.int64)
+        depth = np.zeros(n)
+        a = rows if feat[0] >= 0 else rows[:0]
+        while len(a):
+            at = node[a]
+            node[a] = np.where(x[a, feat[at]] < thr[at], left[at], right[at])
+            depth[a] += 1
+            a = a[feat[node[a]] >= 0]
+        depth_sum += depth + _avg_path(size[node])
+    return 2.0 ** (-(depth_sum / n_trees) / _avg_path(np.array(psi)))
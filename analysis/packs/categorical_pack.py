@@ -1,28 +1,106 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, List, Optional
+import numpy as np
 import pandas as pd
 
+from analysis.correlation import cramers_v, top_pairs
+from analysis.counting import column_codes, column_counts, top_n_other
+from analysis.profiler import is_id_like
+from analysis.sampling import Sampler
+
+MAX_ASSOC_LEVELS = 50      # wider columns are left out of the Cramér's V tables
+MAX_ASSOC_COLS = 20        # pairs grow quadratically
+TOP_ASSOCIATIONS = 5
+STRONG_ASSOCIATION = 0.5
+TIME_BUDGET_S = 10.0       # columns left when it runs out are listed, not counted
+
+
+def run_categorical_pack(
+    df: pd.DataFrame,
+    categorical_cols: List[str],
+    *,
+    top_k: int = 10,
+    max_cols: Optional[int] = None,
+    time_budget_s: float = TIME_BUDGET_S,
+    sampler: Optional[Sampler] = None,
+) -> Dict[str, Any]:
+    """
+    Categorical pack: top values, distinct and non-missing counts of every
+    categorical column (or the first `max_cols`) via analysis.counting.column_counts
+    (integer codes + bincount; a heavy-hitter sketch for very high cardinality),
+    until `time_budget_s` runs out; the remaining columns are listed under
+    summary["not_counted"]. Associations run on the "correlation" sample of `sampler`.
+    """
+    if not categorical_cols:
+        return categorical_from_stats(0, {}, top_k=top_k)
 
-def _is_id_like(series: pd.Series, *, n_rows: int) -> bool:
-    """Heuristic: skip charts for identifier-like columns."""
-    try:
-        n_unique = int(series.nunique(dropna=True))
-        if n_rows <= 0:
-            return False
-        unique_ratio = n_unique / float(n_rows)
-        return unique_ratio >= 0.90
-    except Exception:
-        return False
-
-
-def run_categorical_pack(df: pd.DataFrame, categorical_cols: List[str]) -> Dict[str, Any]:
-    n_rows = int(df.shape[0])
+    cols = [c for c in categorical_cols if c in df.columns][:max_cols]
+    stats: Dict[str, Dict[str, Any]] = {}
+    deadline = time.monotonic() + time_budget_s
+    for c in cols:
+        if stats and time.monotonic() > deadline:
+            break
+        stats[c] = column_counts(df[c], top_k)
+
+    associations = categorical_associations(df, list(stats), {c: st["n_unique"] for c, st in stats.items()}, sampler=sampler)
+    return categorical_from_stats(
+        int(df.shape[0]), stats, top_k=top_k, associations=associations, not_counted=cols[len(stats):],
+    )
+
+
+def association_columns(cols: List[str], n_unique: Dict[str, int], *, max_levels: int = MAX_ASSOC_LEVELS) -> List[str]:
+    """The first MAX_ASSOC_COLS columns with 2..max_levels values; their contingency tables stay small."""
+    return [c for c in cols if 2 <= n_unique.get(c, 0) <= max_levels][:MAX_ASSOC_COLS]
+
+
+def categorical_associations(
+    df: pd.DataFrame,
+    cols: List[str],
+    n_unique: Dict[str, int],
+    *,
+    max_levels: int = MAX_ASSOC_LEVELS,
+    top_k: int = TOP_ASSOCIATIONS,
+    sampler: Optional[Sampler] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Strongest Cramér's V pairs among the association_columns(), on the
+    "correlation" sample (the same rows for any frame of the same length): every
+    column is turned into integer codes once, then each pair is one bincount.
+    Returns [{"x", "y", "cramers_v", "n"}], strongest first. V has no closed-form
+    interval, so `n` (sampled rows with both values) is its error measure.
+    """
+    use = association_columns([c for c in cols if c in df.columns], n_unique, max_levels=max_levels)
+    if len(use) < 2:
+        return []
+    sample, _ = (sampler or Sampler(df)).sample("correlation", columns=use)
+    codes, levels = zip(*(column_codes(sample[c]) for c in use))
+    v, n = cramers_v(np.column_stack(codes), [len(u) for u in levels])
+    return [{"x": p["x"], "y": p["y"], "cramers_v": p["corr"], "n": p["n"]} for p in top_pairs(v, n, use, k=top_k)]
+
+
+def categorical_from_stats(
+    n_rows: int,
+    stats: Dict[str, Dict[str, Any]],
+    *,
+    top_k: int = 10,
+    associations: Optional[List[Dict[str, Any]]] = None,
+    not_counted: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Builds the categorical output from per-column stats
+    ({col: {"top_values": {value: count} (descending), "n_unique": int,
+    "n_valid": non-missing count[, "approx": sketch info]}}) and the
+    categorical_associations() pairs. Every column gets a top-N + Other
+    "distribution" with percentages of its non-missing values.
+    Shared by the pandas and SQL backends.
+    """
     results: Dict[str, Any] = {}
     insights: List[Dict[str, Any]] = []
     charts: List[Dict[str, Any]] = []
 
-    if not categorical_cols:
+    if not stats:
         return {
             "summary": {"n_cols": 0},
             "categoricals": {},
@@ -32,24 +110,24 @@ def run_categorical_pack(df: pd.DataFrame, categorical_cols: List[str]) -> Dict[
             "skipped": "No categorical columns.",
         }
 
-    # Build stats for up to 8 categorical columns
     used_cols: List[str] = []
-    for c in categorical_cols[:8]:
-        if c not in df.columns:
-            continue
-
-        s = df[c]
-        n_unique = int(s.nunique(dropna=True))
-        vc = s.value_counts(dropna=True).head(10)
-
+    for c, st in stats.items():
+        n_unique = int(st["n_unique"])
+        n_valid = int(st.get("n_valid", sum(st["top_values"].values())))
         results[c] = {
-            "top_values": vc.to_dict(),
+            "top_values": st["top_values"],
             "n_unique": n_unique,
+            "n_valid": n_valid,
+            "distribution": top_n_other(
+                dict(list(st["top_values"].items())[:top_k]), n_valid, n_unique=n_unique, approx=bool(st.get("approx")),
+            ),
         }
+        if st.get("approx"):
+            results[c]["approx"] = st["approx"]
         used_cols.append(c)
 
         # insight: ID-like detection
-        if _is_id_like(s, n_rows=n_rows):
+        if is_id_like(n_unique, n_rows=n_rows):
             insights.append({
                 "severity": "info",
                 "title": f"Column '{c}' looks like an identifier",
@@ -57,34 +135,35 @@ def run_categorical_pack(df: pd.DataFrame, categorical_cols: List[str]) -> Dict[
                 "recommendation": "Exclude from categorical distribution charts and most modeling features.",
             })
 
-    # Build charts: up to 2 non-ID-like columns, top10 + percent
-    chart_cols = []
-    for c in used_cols:
-        if not _is_id_like(df[c], n_rows=n_rows):
-            chart_cols.append(c)
-        if len(chart_cols) >= 2:
+    for a in associations or []:
+        if a["cramers_v"] < STRONG_ASSOCIATION:
             break
+        insights.append({
+            "severity": "info",
+            "title": f"'{a['x']}' and '{a['y']}' are strongly associated",
+            "evidence": f"Cramér's V = {a['cramers_v']:.2f} over {a['n']} rows",
+            "recommendation": "Treat them as overlapping when slicing; one may largely determine the other.",
+        })
 
-    for idx, c0 in enumerate(chart_cols):
-        vc0 = df[c0].value_counts(dropna=True).head(10)
-        total = int(vc0.sum()) if len(vc0) else 0
-        chart_values = [
-            {"value": str(k), "count": int(v), "pct": (float(v) / total * 100.0) if total else 0.0}
-            for k, v in vc0.items()
-        ]
+    # Build charts: up to 2 non-ID-like columns (else the first column), top_k + Other, percent of non-missing
+    with_values = [c for c in used_cols if results[c]["n_valid"]]
+    charted = [c for c in with_values if not is_id_like(results[c]["n_unique"], n_rows=n_rows)][:2]
+    chart_cols = charted or with_values[:1]
 
+    for idx, c0 in enumerate(chart_cols):
         spec = {
             "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
             "description": f"Top values for {c0}",
-            "data": {"values": chart_values},
-            "mark": {"type": "bar", "color": "#4f46e5"},
+            "data": {"values": results[c0]["distribution"]},
+            "mark": {"type": "bar"},
             "encoding": {
-                "x": {"field": "value", "type": "nominal", "sort": "-y", "title": c0},
+                "x": {"field": "value", "type": "nominal", "sort": None, "title": c0},
                 "y": {"field": "count", "type": "quantitative", "title": "Count"},
+                "color": {"condition": {"test": "datum.other", "value": "#9ca3af"}, "value": "#4f46e5"},
                 "tooltip": [
                     {"field": "value", "type": "nominal"},
                     {"field": "count", "type": "quantitative"},
-                    {"field": "pct", "type": "quantitative", "format": ".2f", "title": "Percent (%)"},
+                    {"field": "pct", "type": "quantitative", "format": ".2f", "title": "Percent of non-missing (%)"},
                 ],
             },
         }
@@ -93,7 +172,7 @@ def run_categorical_pack(df: pd.DataFrame, categorical_cols: List[str]) -> Dict[
             "id": f"cat_top_{idx+1}",
             "title": f"Top categories: {c0}",
             "spec": spec,
-            "priority": 70 - idx * 5,
+            "priority": 70 - idx * 5 if charted else 50,
             "tags": ["categorical", "distribution"],
         })
 
@@ -103,14 +182,23 @@ def run_categorical_pack(df: pd.DataFrame, categorical_cols: List[str]) -> Dict[
     summary = {
         "n_cols": len(used_cols),
         "cols_used": used_cols,
+        "not_counted": list(not_counted or []),
+        "top_associations": associations or [],
     }
 
     if not charts:
         insights.append({
             "severity": "info",
             "title": "No categorical charts rendered",
-            "evidence": "All candidate columns look like identifiers or have no values.",
-            "recommendation": "Check categorical role detection or allow 'top N + Other' for high-cardinality columns.",
+            "evidence": "No categorical column has non-missing values.",
+            "recommendation": "Check categorical role detection.",
+        })
+    if not_counted:
+        insights.append({
+            "severity": "info",
+            "title": f"{len(not_counted)} categorical column(s) not counted",
+            "evidence": "The categorical time budget ran out before: " + ", ".join(map(str, not_counted[:5])),
+            "recommendation": "Rerun the categorical pack with a larger time_budget_s or an explicit max_cols.",
         })
 
     return {
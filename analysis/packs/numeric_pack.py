@@ -3,11 +3,42 @@ from typing import Dict, Any, List, Optional
 import pandas as pd
 import numpy as np
 
-def run_numeric_pack(df: pd.DataFrame, numeric_cols: List[str], id_like: Optional[List[str]] = None) -> Dict[str, Any]:
+from analysis.correlation import top_pairs
+from analysis.sampling import Sampler, corr_ci, mean_ci
+
+TOP_CORR_PAIRS = 10
+MAX_MATRIX_COLS = 200
+HIST_BINS = 30
+
+def run_numeric_pack(
+    df: pd.DataFrame,
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_corr_cols: int = 12,
+    corr_sample_rows: int = 50000,
+    hist_sample_rows: int = 20000,
+    corr_cols: Optional[List[str]] = None,
+    hist_bins: int = HIST_BINS,
+    method: str = "pearson",
+    max_matrix_cols: int = MAX_MATRIX_COLS,
+    top_k: int = TOP_CORR_PAIRS,
+    sampler: Optional[Sampler] = None,
+) -> Dict[str, Any]:
     """
     Numeric pack:
-      - Correlation heatmap (excluding id_like)
-      - Up to 2 histograms (excluding id_like)
+      - Correlation matrix ("pearson" or "spearman" `method`) over up to
+        `max_matrix_cols` best-populated columns (excluding id_like), ranked into the
+        `top_k` strongest pairs
+      - Correlation heatmap of the columns in those pairs, at most `max_corr_cols`
+        (`corr_cols` picks the columns instead)
+      - Up to 2 histograms (excluding id_like) with `hist_bins` bins
+    Correlations and histograms run on samples from `sampler`, which caches the
+    matrix for the hypothesis verifier; the sample descriptions and correlation
+    confidence intervals (Fisher z for the pack's `method`) are returned under "sampling" and
+    summary["top_correlations"]. Histogram bins are also returned pre-aggregated
+    under "histograms" ({col: {"edges", "counts", "n", "mean_ci"}}) for renderers
+    without Vega; mean_ci is the interval of the column mean from the histogram sample.
     Returns:
       {
         "summary": {...},
@@ -37,35 +68,46 @@ def run_numeric_pack(df: pd.DataFrame, numeric_cols: List[str], id_like: Optiona
 
     # Summary
     desc = df[cols].describe().T
-    out["summary"]["numeric_cols"] = cols[:12]
     out["summary"]["basic_stats"] = desc[["mean", "std", "min", "max"]].head(8).round(4).to_dict(orient="index")
 
     # -----------------------
-    # Correlation heatmap
+    # Correlation matrix -> strongest pairs -> heatmap
     # -----------------------
-    N_CORR = min(12, len(cols))
-    top_cols = (
-        df[cols].notna().sum()
-        .sort_values(ascending=False)
-        .head(N_CORR)
-        .index
-        .tolist()
-    )
-
-    d = df[top_cols].copy()
-    if len(d) > 50000:
-        d = d.sample(50000, random_state=42)
-
-    corr = d.corr(numeric_only=True).fillna(0.0)
-
-    corr_rows = []
-    for r in corr.index:
-        for c in corr.columns:
-            corr_rows.append({"x": str(r), "y": str(c), "corr": float(corr.loc[r, c])})
+    chosen = [c for c in dict.fromkeys(corr_cols or []) if c in cols][:max_corr_cols]
+    if len(chosen) >= 2:
+        matrix_cols = chosen
+    else:
+        matrix_cols = df[cols].notna().sum().sort_values(ascending=False, kind="stable").head(max_matrix_cols).index.tolist()
+
+    sampler = sampler or Sampler(df)
+    r_mat, n_mat, corr_info = sampler.correlation(matrix_cols, method=method, budget=corr_sample_rows)
+    out["sampling"] = {"correlation": corr_info}
+
+    # Fisher-z intervals (method-specific variance) so the narrator can cite the sampling error
+    pairs = top_pairs(r_mat, n_mat, matrix_cols, k=top_k)
+    for p in pairs:
+        p.update({k: v for k, v in corr_ci(p["corr"], p.pop("n"), method=method).items() if k != "estimate"})
+    out["summary"]["top_correlations"] = pairs
+    out["summary"]["corr_method"] = method
+    out["summary"]["n_matrix_cols"] = len(matrix_cols)
+
+    if len(chosen) >= 2:
+        heat_cols = chosen
+    else:
+        heat_cols = list(dict.fromkeys(c for p in pairs for c in (p["x"], p["y"])))[:max_corr_cols]
+        if len(heat_cols) < 2:
+            heat_cols = matrix_cols[:max_corr_cols]
+    out["summary"]["numeric_cols"] = heat_cols
+
+    pos = {c: i for i, c in enumerate(matrix_cols)}
+    idx = np.array([pos[c] for c in heat_cols], dtype=np.int64)
+    sub = np.nan_to_num(r_mat[np.ix_(idx, idx)], nan=0.0)
+    names = [str(c) for c in heat_cols]
+    corr_rows = [{"x": names[i], "y": names[j], "corr": float(sub[i, j])} for i in range(len(names)) for j in range(len(names))]
 
     corr_spec = {
         "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
-        "description": "Correlation heatmap (numeric columns)",
+        "description": f"Correlation heatmap ({method}, strongest pairs)",
         "data": {"values": corr_rows},
         "mark": {"type": "rect"},
         "encoding": {
@@ -100,13 +142,23 @@ def run_numeric_pack(df: pd.DataFrame, numeric_cols: List[str], id_like: Optiona
     hist_cols = [c for c in var_rank.index.tolist()][:2]
 
     for i, col in enumerate(hist_cols, start=1):
-        s = df[col].dropna()
+        hs, hist_info = sampler.sample("histogram", budget=hist_sample_rows, columns=[col])
+        out["sampling"]["histogram"] = hist_info
+        s = hs[col].dropna()
         if s.empty:
             continue
-        if len(s) > 20000:
-            s = s.sample(20000, random_state=42)
 
         values = [{"value": float(v)} for v in s.values.astype(float)]
+        x = s.to_numpy(dtype=float)
+        x = x[np.isfinite(x)]
+        if len(x):
+            counts, edges = np.histogram(x, bins=hist_bins)
+            out.setdefault("histograms", {})[col] = {
+                "edges": [float(e) for e in edges],
+                "counts": [int(c) for c in counts],
+                "n": int(len(x)),
+                "mean_ci": mean_ci(s, n_total=int(df[col].notna().sum())),
+            }
 
         hist_spec = {
             "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
@@ -114,7 +166,7 @@ def run_numeric_pack(df: pd.DataFrame, numeric_cols: List[str], id_like: Optiona
             "data": {"values": values},
             "mark": {"type": "bar"},
             "encoding": {
-                "x": {"field": "value", "type": "quantitative", "bin": {"maxbins": 30}, "title": col},
+                "x": {"field": "value", "type": "quantitative", "bin": {"maxbins": hist_bins}, "title": col},
                 "y": {"aggregate": "count", "type": "quantitative", "title": "Count"},
                 "tooltip": [
                     {"field": "value", "type": "quantitative", "bin": True, "title": col},
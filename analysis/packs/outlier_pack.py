@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.hypothesis_verify import outlier_evidence
+from analysis.outliers import MAD_Z, isolation_scores, modified_z, robust_outliers
+from analysis.profiler import measure_columns
+from analysis.sampling import Sampler, proportion_ci, stage_budget
+
+TOP_ROWS = 5
+ISOLATION_FLAG = 0.65     # isolation score from which a row counts as a multivariate outlier
+
+
+def run_outlier_pack(
+    df: pd.DataFrame,
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_cols: int = 12,
+    top_rows: int = TOP_ROWS,
+    multivariate: bool = True,
+    sample_rows: Optional[int] = None,
+    sampler: Optional[Sampler] = None,
+) -> Dict[str, Any]:
+    """
+    Outlier pack: IQR-fence and MAD (modified z) outlier counts for every numeric
+    column in one pass over the 2D array (analysis.outliers), the rows furthest out
+    per column, and with `multivariate` an isolation-forest score on a sample of
+    `sample_rows` rows (stage budget "outliers"). Per-column evidence has the shape of
+    the `outlier_share` hypothesis evidence, computed by the same kernel.
+    """
+    cols = measure_columns(
+        [c for c in numeric_cols if c in df.columns and pd.api.types.is_numeric_dtype(df[c])],
+        id_like, lambda c: pd.api.types.is_integer_dtype(df[c]), max_cols=max_cols,
+    )
+    if not cols:
+        return outliers_from_stats(int(len(df)), [], {}, {})
+
+    x = df[cols].to_numpy(dtype=float, na_value=np.nan)
+    st = robust_outliers(x)
+
+    # furthest rows per column: partition on |modified z| (on |x - median| when the MAD is 0),
+    # ties to the earlier row
+    z = modified_z(x, st["median"], st["mad"])
+    dist = np.nan_to_num(np.where(st["mad"] > 0, np.abs(z), np.abs(x - st["median"])), nan=-1.0)
+    tops: Dict[str, List[Dict[str, Any]]] = {}
+    for j, c in enumerate(cols):
+        k = min(top_rows, int((dist[:, j] >= 0).sum()))
+        if not k:
+            tops[c] = []
+            continue
+        cand = np.flatnonzero(dist[:, j] >= np.partition(dist[:, j], -k)[-k])
+        idx = cand[np.lexsort((cand, -dist[cand, j]))][:k]
+        tops[c] = [_row(df.index[i], x[i, j], z[i, j]) for i in idx]
+
+    mv = None
+    if multivariate and len(cols) >= 2:
+        sampler = sampler or Sampler(df)
+        sample, info = sampler.sample("outliers", budget=sample_rows or stage_budget("outliers"), columns=cols)
+        mv = multivariate_outliers(sample, st["median"], top_rows=top_rows, info=info)
+    return outliers_from_stats(int(len(df)), cols, st, tops, mv)
+
+
+def _row_id(index: Any) -> Any:
+    return int(index) if isinstance(index, (int, np.integer)) else str(index)
+
+
+def _row(index: Any, value: float, z: float) -> Dict[str, Any]:
+    return {"row": _row_id(index), "value": float(value), "robust_z": None if np.isnan(z) else float(z)}
+
+
+def multivariate_outliers(
+    sample: pd.DataFrame,
+    medians: np.ndarray,
+    *,
+    top_rows: int = TOP_ROWS,
+    info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Isolation-forest scores of the sample rows (index = row ids; NaN -> column median).
+    flagged_share_ci is the interval of the flagged share over all `info["n_total"]` rows.
+    """
+    x = sample.to_numpy(dtype=float, na_value=np.nan)
+    x = np.where(np.isnan(x), medians, x)
+    scores = isolation_scores(x)
+    order = np.argsort(-np.nan_to_num(scores, nan=-1.0), kind="stable")[:top_rows]
+    share = float((scores >= ISOLATION_FLAG).mean()) if len(x) else 0.0
+    return {
+        "method": "isolation forest (100 trees x 256 rows)",
+        "n_scored": int(len(x)),
+        "threshold": ISOLATION_FLAG,
+        "n_flagged": int((scores >= ISOLATION_FLAG).sum()),
+        "flagged_share": share,
+        "flagged_share_ci": proportion_ci(share, int(len(x)), n_total=(info or {}).get("n_total")),
+        "top_rows": [
+            {"row": _row_id(sample.index[i]), "score": float(scores[i]),
+             "values": {c: (None if pd.isna(v) else float(v)) for c, v in sample.iloc[i].items()}}
+            for i in order
+        ],
+        "sampling": info or {},
+    }
+
+
+def outliers_from_stats(
+    n_rows: int,
+    cols: List[str],
+    st: Dict[str, np.ndarray],
+    tops: Dict[str, List[Dict[str, Any]]],
+    multivariate: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Builds the outlier output from robust_outliers() stats (arrays aligned with `cols`)
+    and the per-column top rows. Shared by the pandas and engine backends.
+    """
+    if not cols:
+        return {"summary": {"columns": []}, "columns": {}, "insights": [], "charts": [], "skipped": "No usable numeric columns."}
+
+    columns: Dict[str, Any] = {}
+    for j, c in enumerate(cols):
+        n = int(st["n"][j])
+        if n == 0:
+            continue
+        columns[c] = {
+            **outlier_evidence(int(st["n_iqr"][j]), n, float(st["lo"][j]), float(st["hi"][j])),
+            "median": float(st["median"][j]),
+            "mad": float(st["mad"][j]),
+            "n_mad_outliers": int(st["n_mad"][j]),
+            "mad_outlier_share": float(st["n_mad"][j] / n),
+            "top_rows": tops.get(c, []),
+        }
+
+    ranked = sorted(columns, key=lambda c: -columns[c]["outlier_share"])
+    insights = []
+    for c in ranked[:3]:
+        r = columns[c]
+        if r["outlier_share"] < 0.01:
+            break
+        worst = r["top_rows"][0] if r["top_rows"] else None
+        insights.append({
+            "severity": "warning" if r["outlier_share"] >= 0.05 else "info",
+            "title": f"'{c}' has {r['outlier_share']:.1%} outliers",
+            "evidence": f"{r['n_outliers']} of {r['n']} values outside [{r['lower_fence']:.4g}, {r['upper_fence']:.4g}]"
+                        + (f"; most extreme {worst['value']:.4g} (row {worst['row']})" if worst else ""),
+            "recommendation": "Check these rows for entry errors or unit mix-ups; use medians or winsorize before averaging.",
+        })
+    if multivariate and multivariate["top_rows"] and multivariate["top_rows"][0]["score"] >= ISOLATION_FLAG:
+        top = multivariate["top_rows"][0]
+        ci = multivariate.get("flagged_share_ci") or {}
+        insights.append({
+            "severity": "info",
+            "title": f"{multivariate['n_flagged']} of {multivariate['n_scored']} scored rows are unusual across columns",
+            "evidence": f"Isolation score {top['score']:.2f} (>= {ISOLATION_FLAG} flags) for row {top['row']}"
+                        + (f"; {ci['ci_low']:.1%}-{ci['ci_high']:.1%} of all rows (95% CI)" if "ci_low" in ci else ""),
+            "recommendation": "Review rows that combine values rarely seen together, even when each value looks normal.",
+        })
+
+    bars = [
+        {"column": c, "method": m, "share": columns[c][k]}
+        for c in ranked for m, k in (("IQR", "outlier_share"), (f"MAD z>{MAD_Z}", "mad_outlier_share"))
+    ]
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "description": "Outlier share per numeric column",
+        "data": {"values": bars},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "y": {"field": "column", "type": "nominal", "sort": None, "title": None},
+            "x": {"field": "share", "type": "quantitative", "axis": {"format": "%"}, "title": "Share of values"},
+            "yOffset": {"field": "method"},
+            "color": {"field": "method", "type": "nominal", "title": None},
+            "tooltip": [{"field": "column"}, {"field": "method"}, {"field": "share", "type": "quantitative", "format": ".2%"}],
+        },
+    }
+    return {
+        "summary": {
+            "columns": list(columns),
+            "n_rows": n_rows,
+            "most_outliers": [{"col": c, "outlier_share": columns[c]["outlier_share"]} for c in ranked[:5]],
+        },
+        "columns": columns,
+        "multivariate": multivariate,
+        "insights": insights,
+        "charts": [{
+            "id": "outlier_share",
+            "title": "Outlier share by column",
+            "spec": spec,
+            "priority": 75 if insights else 55,
+            "tags": ["numeric", "outliers"],
+        }],
+    }
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.profiler import measure_columns
+
+MIN_GROUP_ROWS = 30        # smaller groups are listed but not ranked as deviations
+TOP_DEVIATIONS = 10
+MIN_STD_DIFF = 0.2         # smaller deviations are not reported as insights
+
+
+def segment_keys(
+    categorical_cols: List[str],
+    n_unique: Dict[str, int],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_keys: int = 3,
+    max_cardinality: int = 30,
+) -> List[str]:
+    """Group-by keys: non-id categoricals with 2..max_cardinality values, lowest cardinality first."""
+    ok = [c for c in categorical_cols if c not in set(id_like or []) and 2 <= n_unique.get(c, 0) <= max_cardinality]
+    return sorted(ok, key=lambda c: n_unique[c])[:max_keys]
+
+
+def run_segment_pack(
+    df: pd.DataFrame,
+    categorical_cols: List[str],
+    numeric_cols: List[str],
+    id_like: Optional[List[str]] = None,
+    *,
+    max_keys: int = 3,
+    max_cardinality: int = 30,
+    max_cols: int = 8,
+    top_k: int = TOP_DEVIATIONS,
+) -> Dict[str, Any]:
+    """
+    Segmentation pack: for each low-cardinality categorical key, one groupby
+    computes count, mean and median of every measure (missing share = 1 - count/rows),
+    then the groups that deviate most from the overall mean are ranked.
+    Cost is bounded by max_keys x max_cardinality groups and max_cols measures.
+    """
+    keys = segment_keys(
+        [c for c in categorical_cols if c in df.columns],
+        {c: int(df[c].nunique(dropna=True)) for c in categorical_cols if c in df.columns},
+        id_like, max_keys=max_keys, max_cardinality=max_cardinality,
+    )
+    cols = measure_columns(
+        [c for c in numeric_cols if c in df.columns and pd.api.types.is_numeric_dtype(df[c]) and c not in keys],
+        id_like, lambda c: pd.api.types.is_integer_dtype(df[c]), max_cols=max_cols,
+    )
+    if not keys or not cols:
+        return segment_from_stats(int(len(df)), {}, {}, top_k=top_k)
+
+    values = df[cols].astype(float)
+    agg = values.agg(["count", "mean", "median", "std"])
+    overall = {c: {s: _num(agg.at[s, c]) for s in ("count", "mean", "median", "std")} for c in cols}
+
+    segments: Dict[str, Any] = {}
+    for key in keys:
+        g = values.groupby(df[key], observed=True, sort=False)
+        stats = g.agg(["count", "mean", "median"])     # one multi-aggregate pass per key
+        rows = g.size()
+        segments[key] = {
+            "n_unique": int(len(rows)),
+            "groups": [
+                {"value": group_label(v), "rows": int(rows[v]),
+                 "columns": {c: {s: _num(stats.at[v, (c, s)]) for s in ("count", "mean", "median")} for c in cols}}
+                for v in rows.index
+            ],
+        }
+    return segment_from_stats(int(len(df)), overall, segments, top_k=top_k)
+
+
+def _num(v: Any) -> Optional[float]:
+    return None if v is None or pd.isna(v) else float(v)
+
+
+def group_label(v: Any) -> str:
+    """Group value as text, the same on every backend (an int key with missing values is float in pandas)."""
+    return str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)
+
+
+def segment_from_stats(
+    n_rows: int,
+    overall: Dict[str, Dict[str, Any]],
+    segments: Dict[str, Dict[str, Any]],
+    *,
+    top_k: int = TOP_DEVIATIONS,
+) -> Dict[str, Any]:
+    """
+    Builds the segment output from aggregates. Shared by the pandas and engine backends.
+      overall:  {col: {"count", "mean", "median", "std"}}
+      segments: {key: {"n_unique", "groups": [{"value", "rows", "columns": {col: {"count", "mean", "median"}}}]}}
+    Deviation of a group = (group mean - overall mean) / overall std; the top_k by
+    absolute size (groups of MIN_GROUP_ROWS+ rows) become evidence and charts.
+    """
+    if not segments or not overall:
+        return {"summary": {"keys": [], "columns": []}, "insights": [], "charts": [], "skipped": "No low-cardinality key with numeric columns."}
+
+    cols = list(overall)
+    for st in overall.values():
+        st["missing_share"] = 1.0 - st["count"] / n_rows if n_rows else None
+    for seg in segments.values():
+        seg["groups"].sort(key=lambda g: (-g["rows"], g["value"]))
+        for g in seg["groups"]:
+            for st in g["columns"].values():
+                st["missing_share"] = 1.0 - st["count"] / g["rows"] if g["rows"] else None
+
+    # one matrix of standardized deviations over every (key, group) x column; top-k by argpartition
+    flat = [(key, g) for key, seg in segments.items() for g in seg["groups"]]
+    means = np.array([[g["columns"][c]["mean"] for c in cols] for _, g in flat], dtype=float)
+    center = np.array([overall[c]["mean"] for c in cols], dtype=float)
+    scale = np.array([overall[c]["std"] for c in cols], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dev = (means - center) / np.where(scale > 0, scale, np.nan)
+    dev[np.array([g["rows"] < MIN_GROUP_ROWS for _, g in flat])] = np.nan
+    score = np.nan_to_num(np.abs(dev), nan=-1.0).ravel()
+    k = min(top_k, int((score >= 0).sum()))
+    top = np.argpartition(-score, k - 1)[:k] if k else np.array([], dtype=int)
+    top = top[np.argsort(-score[top], kind="stable")]
+
+    deviations: List[Dict[str, Any]] = []
+    for idx in top:
+        i, j = divmod(int(idx), len(cols))
+        key, g = flat[i]
+        c = cols[j]
+        deviations.append({
+            "by": key, "value": g["value"], "col": c, "rows": g["rows"],
+            "mean": g["columns"][c]["mean"], "overall_mean": overall[c]["mean"],
+            "std_diff": float(dev[i, j]),
+            "lift": g["columns"][c]["mean"] / overall[c]["mean"] - 1.0 if overall[c]["mean"] else None,
+        })
+
+    insights = []
+    for d in deviations[:3]:
+        if abs(d["std_diff"]) < MIN_STD_DIFF:
+            break
+        insights.append({
+            "severity": "warning" if abs(d["std_diff"]) >= 0.5 else "info",
+            "title": f"'{d['col']}' is {'higher' if d['std_diff'] > 0 else 'lower'} for {d['by']} = {d['value']}",
+            "evidence": f"Mean {d['mean']:.4g} vs {d['overall_mean']:.4g} overall ({d['std_diff']:+.2f} std, {d['rows']} rows)",
+            "recommendation": f"Break down '{d['col']}' by {d['by']} before reading overall averages.",
+        })
+
+    charts = []
+    seen = set()
+    for d in deviations:
+        if (d["by"], d["col"]) in seen:
+            continue
+        seen.add((d["by"], d["col"]))
+        chart = _segment_chart(d["by"], d["col"], segments[d["by"]]["groups"], overall[d["col"]]["mean"], len(charts) + 1)
+        if abs(d["std_diff"]) < MIN_STD_DIFF:
+            chart["priority"] = 60   # flat segments: keep the chart, below the other packs' findings
+        charts.append(chart)
+        if len(charts) == 2:
+            break
+
+    return {
+        "summary": {"keys": list(segments), "columns": cols, "top_deviations": deviations},
+        "overall": overall,
+        "segments": segments,
+        "insights": insights,
+        "charts": charts,
+    }
+
+
+def _segment_chart(key: str, col: str, groups: List[Dict[str, Any]], overall_mean: float, i: int) -> Dict[str, Any]:
+    rows = [{"segment": g["value"], "mean": g["columns"][col]["mean"], "rows": g["rows"]} for g in groups if g["columns"][col]["mean"] is not None]
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "description": f"Mean {col} by {key}",
+        "layer": [
+            {"data": {"values": rows}, "mark": {"type": "bar"},
+             "encoding": {
+                 "x": {"field": "segment", "type": "nominal", "sort": "-y", "title": key},
+                 "y": {"field": "mean", "type": "quantitative", "title": f"mean {col}"},
+                 "tooltip": [{"field": "segment", "type": "nominal"}, {"field": "mean", "type": "quantitative", "format": ".4g"},
+                             {"field": "rows", "type": "quantitative"}],
+             }},
+            {"data": {"values": [{"overall": overall_mean}]}, "mark": {"type": "rule", "strokeDash": [4, 3], "color": "#dc2626"},
+             "encoding": {"y": {"field": "overall", "type": "quantitative"}}},
+        ],
+    }
+    return {"id": f"segment_{i}", "title": f"Mean {col} by {key}", "spec": spec, "priority": 88, "tags": ["segment"]}
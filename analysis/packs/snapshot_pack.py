@@ -18,15 +18,36 @@ def run_snapshot_pack(df: pd.DataFrame) -> Dict[str, Any]:
         "skipped": "...",         # optional
       }
     """
+    missing = df.isna().sum().sort_values(ascending=False).head(20)
+    return snapshot_from_stats(
+        n_rows=int(df.shape[0]),
+        n_cols=int(df.shape[1]),
+        duplicate_rows=int(df.duplicated().sum()),
+        sample_rows=df.head(5).to_dict(orient="records"),
+        missing=missing,
+    )
+
+
+def snapshot_from_stats(
+    *,
+    n_rows: int,
+    n_cols: int,
+    duplicate_rows: int,
+    sample_rows: List[Dict[str, Any]],
+    missing: pd.Series,
+) -> Dict[str, Any]:
+    """
+    Builds the snapshot output from precomputed stats (`missing`: top-20 missing
+    counts by column, descending). Shared by the pandas and SQL backends.
+    """
     out: Dict[str, Any] = {}
 
     # Basic stats (always)
-    out["shape"] = {"rows": int(df.shape[0]), "cols": int(df.shape[1])}
-    out["duplicate_rows"] = int(df.duplicated().sum())
-    out["sample_rows"] = df.head(5).to_dict(orient="records")
+    out["shape"] = {"rows": int(n_rows), "cols": int(n_cols)}
+    out["duplicate_rows"] = int(duplicate_rows)
+    out["sample_rows"] = sample_rows
 
     # Missing values
-    missing = df.isna().sum().sort_values(ascending=False).head(20)
     out["missing_by_col_top20"] = missing.to_dict()
 
     missing_df = (
@@ -36,7 +57,7 @@ def run_snapshot_pack(df: pd.DataFrame) -> Dict[str, Any]:
     if "missing" not in missing_df.columns:
         missing_df.columns = ["column", "missing"]
 
-    total_rows = max(int(df.shape[0]), 1)
+    total_rows = max(int(n_rows), 1)
     missing_df["percent"] = (missing_df["missing"] / total_rows) * 100.0
 
     # ✅ If no missing at all -> don't emit empty charts
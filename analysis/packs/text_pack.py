@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analysis.counting import top_counts
+from analysis.sampling import Sampler, proportion_ci, stage_budget
+
+TOKEN_PATTERN = r"\w+"       # Unicode word characters: no language-specific tokenizer or stop words
+N_FEATURES = 1 << 18         # hash buckets per n-gram size; memory does not grow with the vocabulary
+MAX_DOC_CHARS = 2_000        # longer values are truncated before tokenizing
+TOP_TERMS = 15
+BLANK_WARNING = 0.1          # empty/whitespace share of values from which it becomes an insight
+PHRASE_SHARE = 0.05          # a bigram in this share of values is reported
+
+
+def tokenize(docs: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """(tokens, document position) of the casefolded word tokens of every value, in order."""
+    toks = (
+        docs.reset_index(drop=True).astype(str)
+        .str.slice(0, MAX_DOC_CHARS).str.casefold().str.findall(TOKEN_PATTERN)
+        .explode().dropna()
+    )
+    return toks.to_numpy(dtype=object), toks.index.to_numpy(dtype=np.int64)
+
+
+def hashed_ngrams(
+    tokens: np.ndarray,
+    doc: np.ndarray,
+    n: int,
+    *,
+    n_docs: int,
+    n_features: int = N_FEATURES,
+    top_k: int = TOP_TERMS,
+) -> List[Dict[str, Any]]:
+    """
+    Top n-grams (n = 1 or 2, never across values) by a hashing vectorizer: each
+    n-gram is hashed into one of `n_features` buckets counted with np.bincount, so
+    no vocabulary is built. A bucket is named by its first n-gram; with 2**18
+    buckets a collision among the top terms is unlikely.
+    Returns [{"term", "count", "doc_share"}]; doc_share is the share of values containing it.
+    """
+    if n == 2:
+        keep = doc[1:] == doc[:-1]
+        terms, doc = tokens[:-1][keep] + " " + tokens[1:][keep], doc[1:][keep]
+    else:
+        terms = tokens
+    if not len(terms):
+        return []
+    h = (pd.util.hash_array(terms, categorize=False) % np.uint64(n_features)).astype(np.int64)
+    counts = np.bincount(h, minlength=n_features)
+    top = top_counts(pd.RangeIndex(n_features), counts, top_k)
+
+    # documents per bucket: one count per distinct (document, bucket) pair
+    pairs = np.unique(doc * n_features + h)
+    doc_counts = np.bincount(pairs % n_features, minlength=n_features)
+    return [
+        {"term": str(terms[int(np.argmax(h == b))]), "count": int(c), "doc_share": float(doc_counts[b] / max(n_docs, 1))}
+        for b, c in top.items()
+    ]
+
+
+def length_stats(s: pd.Series) -> Dict[str, Any]:
+    """Missing share, empty/whitespace share and character-length quantiles of a full column."""
+    v = s.dropna().astype(str)
+    lens = v.str.len().to_numpy(dtype=float)
+    q = np.quantile(lens, [0.1, 0.5, 0.9]) if len(lens) else [np.nan] * 3
+    return {
+        "n": int(len(s)),
+        "n_valid": int(len(v)),
+        "n_blank": int((v.str.strip() == "").sum()),
+        "mean_len": float(lens.mean()) if len(lens) else None,
+        "p10_len": float(q[0]) if len(lens) else None,
+        "p50_len": float(q[1]) if len(lens) else None,
+        "p90_len": float(q[2]) if len(lens) else None,
+        "max_len": int(lens.max()) if len(lens) else None,
+    }
+
+
+def term_stats(sample: pd.Series, *, n_features: int = N_FEATURES, top_k: int = TOP_TERMS) -> Dict[str, Any]:
+    """Token and bigram frequencies of the non-missing sample values."""
+    docs = sample.dropna()
+    tokens, doc = tokenize(docs)
+    return {
+        "n_docs": int(len(docs)),
+        "tokens_per_value": float(len(tokens) / len(docs)) if len(docs) else 0.0,
+        "top_tokens": hashed_ngrams(tokens, doc, 1, n_docs=len(docs), n_features=n_features, top_k=top_k),
+        "top_bigrams": hashed_ngrams(tokens, doc, 2, n_docs=len(docs), n_features=n_features, top_k=top_k),
+    }
+
+
+def run_text_pack(
+    df: pd.DataFrame,
+    text_cols: List[str],
+    *,
+    max_cols: int = 4,
+    top_k: int = TOP_TERMS,
+    n_features: int = N_FEATURES,
+    sample_rows: Optional[int] = None,
+    sampler: Optional[Sampler] = None,
+) -> Dict[str, Any]:
+    """
+    Text pack for free-form columns (the "text" role): lengths and the empty/whitespace
+    share on every row, token and bigram frequencies (hashed, see hashed_ngrams) on a
+    sample of `sample_rows` rows (stage budget "text").
+    """
+    cols = [c for c in text_cols if c in df.columns][:max_cols]
+    if not cols:
+        return text_from_stats(int(len(df)), {}, {})
+    sampler = sampler or Sampler(df)
+    sample, info = sampler.sample("text", budget=sample_rows or stage_budget("text"), columns=cols)
+    return text_from_stats(
+        int(len(df)),
+        {c: length_stats(df[c]) for c in cols},
+        {c: term_stats(sample[c], n_features=n_features, top_k=top_k) for c in cols},
+        info,
+    )
+
+
+def text_from_stats(
+    n_rows: int,
+    lengths: Dict[str, Dict[str, Any]],
+    terms: Dict[str, Dict[str, Any]],
+    info: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Builds the text output from length_stats() (full data) and term_stats() (sample)
+    per column; every term's doc_share gets an interval ("se", "ci_low", "ci_high")
+    over the column's non-missing values. Shared by the pandas and engine backends.
+    """
+    if not lengths:
+        return {"summary": {"columns": []}, "columns": {}, "insights": [], "charts": [], "skipped": "No free-text columns."}
+
+    columns: Dict[str, Any] = {}
+    insights: List[Dict[str, Any]] = []
+    for c, st in lengths.items():
+        t = terms.get(c, {})
+        for term in (t.get("top_tokens") or []) + (t.get("top_bigrams") or []):
+            ci = proportion_ci(term["doc_share"], t["n_docs"], n_total=st["n_valid"])
+            term.update({k: v for k, v in ci.items() if k not in ("estimate", "n")})
+        columns[c] = {
+            **st,
+            "missing_share": 1.0 - st["n_valid"] / st["n"] if st["n"] else None,
+            "blank_share": st["n_blank"] / st["n_valid"] if st["n_valid"] else None,
+            **t,
+        }
+        r = columns[c]
+        if r["blank_share"] is not None and r["blank_share"] >= BLANK_WARNING:
+            insights.append({
+                "severity": "warning",
+                "title": f"{r['blank_share']:.1%} of '{c}' values are empty or whitespace",
+                "evidence": f"{r['n_blank']} of {r['n_valid']} non-missing values have no text",
+                "recommendation": "Treat blank text as missing before counting responses.",
+            })
+        phrase = (r.get("top_bigrams") or [None])[0]
+        if phrase and phrase["doc_share"] >= PHRASE_SHARE:
+            words = ", ".join(f"'{t['term']}'" for t in (r.get("top_tokens") or [])[:5])
+            insights.append({
+                "severity": "info",
+                "title": f"'{phrase['term']}' appears in {phrase['doc_share']:.1%} of '{c}' values",
+                "evidence": f"Most frequent words: {words}; median length {r['p50_len']:.0f} characters",
+                "recommendation": f"Tag '{c}' by its recurring phrases to compare them against the other columns.",
+            })
+
+    charts = [_terms_chart(c, columns[c], i) for i, c in enumerate([c for c in columns if columns[c].get("top_tokens")][:2], start=1)]
+    return {
+        "summary": {
+            "columns": list(columns),
+            "n_rows": n_rows,
+            "top_terms": {c: [t["term"] for t in (r.get("top_tokens") or [])[:5]] for c, r in columns.items()},
+        },
+        "columns": columns,
+        "sampling": {"text": info or {}},
+        "insights": insights,
+        "charts": charts,
+    }
+
+
+def _terms_chart(col: str, r: Dict[str, Any], i: int) -> Dict[str, Any]:
+    rows = [{"term": t["term"], "count": t["count"], "doc_share": t["doc_share"], "kind": kind}
+            for kind, key in (("word", "top_tokens"), ("phrase", "top_bigrams")) for t in (r.get(key) or [])[:10]]
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "description": f"Most frequent words and phrases in {col}",
+        "data": {"values": rows},
+        "mark": {"type": "bar"},
+        "encoding": {
+            "y": {"field": "term", "type": "nominal", "sort": "-x", "title": None},
+            "x": {"field": "doc_share", "type": "quantitative", "axis": {"format": "%"}, "title": "Share of values"},
+            "color": {"field": "kind", "type": "nominal", "title": None},
+            "tooltip": [{"field": "term"}, {"field": "count", "type": "quantitative"},
+                        {"field": "doc_share", "type": "quantitative", "format": ".1%"}],
+        },
+    }
+    return {"id": f"text_terms_{i}", "title": f"Frequent terms: {col}", "spec": spec, "priority": 68 - 5 * (i - 1),
+            "tags": ["text", "categorical"]}
@@ -1,10 +1,37 @@
 from __future__ import annotations
 
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
+from analysis.sampling import Sampler
 
-def run_timeseries_pack(df: pd.DataFrame, datetime_col: str, numeric_cols: List[str]) -> Dict[str, Any]:
+
+# plan param -> (pandas resample rule, label)
+FREQS = {"H": ("h", "Hourly"), "D": ("D", "Daily"), "W": ("W", "Weekly"), "M": ("MS", "Monthly")}
+# granularities other than the selected one are left out of the cube beyond this many periods
+CUBE_MAX_PERIODS = 1000
+CHART_MAX_COLS = 5
+CHART_MAX_PERIODS = 400      # latest periods per granularity in the chart dataset
+CHART_DATASET = "ts_cube"
+HOUR_NS = 3_600_000_000_000
+STATS = ("count", "sum", "mean", "min", "max")
+
+
+def run_timeseries_pack(
+    df: pd.DataFrame,
+    datetime_col: str,
+    numeric_cols: List[str],
+    *,
+    freq: str = "D",
+    rolling_window: int = 7,
+    sampler: Optional[Sampler] = None,
+) -> Dict[str, Any]:
+    """
+    One pass over the frame: hourly count/sum/min/max per numeric column
+    (bincount over integer hour codes), rolled up into the cube. The datetime
+    column is parsed once per dataset through `sampler`.
+    """
     out: Dict[str, Any] = {
         "datetime_col": datetime_col,
         "numeric_cols": numeric_cols[:5],
@@ -16,29 +43,206 @@ def run_timeseries_pack(df: pd.DataFrame, datetime_col: str, numeric_cols: List[
         out["skipped"] = f"Datetime column '{datetime_col}' not found."
         return out
 
-    d = df.copy()
-    d[datetime_col] = pd.to_datetime(d[datetime_col], errors="coerce")
-    d = d.dropna(subset=[datetime_col]).sort_values(datetime_col)
+    ts = (sampler or Sampler(df)).datetimes(datetime_col)
+    if isinstance(ts.dtype, pd.DatetimeTZDtype):
+        ts = ts.dt.tz_localize(None)   # bucket on local wall time, as resample did
+    ts = ts.to_numpy(dtype="datetime64[ns]")
+    valid = ~np.isnat(ts)
 
-    out["n_points"] = int(len(d))
-    if len(d) == 0 or not numeric_cols:
+    out["n_points"] = int(valid.sum())
+    if out["n_points"] == 0 or not numeric_cols:
         out["skipped"] = "Not enough datetime rows or no numeric columns."
         return out
 
     # Keep only numeric cols that exist
-    use_num = [c for c in numeric_cols if c in d.columns]
+    use_num = [c for c in numeric_cols if c in df.columns]
     if not use_num:
         out["skipped"] = "No numeric columns found in dataframe."
         return out
 
-    d = d.set_index(datetime_col)
-    daily = d[use_num].resample("D").mean().dropna(how="all")
+    values = df[use_num].to_numpy(dtype=float, na_value=np.nan)[valid]
+    hourly = hourly_aggregates(ts[valid].view("int64") // HOUR_NS, values)
+    return timeseries_from_hourly(out, hourly, use_num, freq=freq, rolling_window=rolling_window)
+
+
+def hourly_aggregates(hours: np.ndarray, values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-hour rows and count/sum/min/max per column of `values` (n x k, NaN = missing)
+    for integer hour codes (hours since epoch). Returns only hours with rows, sorted:
+    {"hour": (m,), "rows": (m,), "count"/"sum"/"min"/"max": (m, k)}.
+    """
+    lo = int(hours.min())
+    span = int(hours.max()) - lo + 1
+    if span <= max(4 * len(hours), 1 << 20):
+        idx = hours - lo
+        hour = np.arange(span, dtype=np.int64) + lo
+    else:   # sparse codes (e.g. a few stray dates decades away): compact them first
+        hour, idx = np.unique(hours, return_inverse=True)
+        span = len(hour)
+
+    rows = np.bincount(idx, minlength=span)
+    k = values.shape[1]
+    count = np.zeros((span, k))
+    total = np.zeros((span, k))
+    vmin = np.full((span, k), np.nan)
+    vmax = np.full((span, k), np.nan)
+    for j in range(k):
+        v = values[:, j]
+        ok = ~np.isnan(v)
+        count[:, j] = np.bincount(idx[ok], minlength=span)
+        total[:, j] = np.bincount(idx[ok], weights=v[ok], minlength=span)
+        np.fmin.at(vmin[:, j], idx, v)   # fmin/fmax skip NaN
+        np.fmax.at(vmax[:, j], idx, v)
+
+    keep = rows > 0
+    return {"hour": hour[keep], "rows": rows[keep], "count": count[keep], "sum": total[keep], "min": vmin[keep], "max": vmax[keep]}
+
+
+def hourly_from_table(table: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    hourly_aggregates layout from an engine's GROUP BY hour result: columns hour, rows,
+    then count, sum, min, max per numeric column (NULL/None -> NaN).
+    """
+    t = np.asarray(table, dtype=float).reshape(-1, table.shape[1] if len(table) else 2)
+    return {
+        "hour": t[:, 0].astype(np.int64), "rows": t[:, 1],
+        "count": np.nan_to_num(t[:, 2::4]), "sum": np.nan_to_num(t[:, 3::4]),
+        "min": t[:, 4::4], "max": t[:, 5::4],
+    }
+
+
+def _period_codes(hours: np.ndarray, g: str) -> np.ndarray:
+    if g == "H":
+        return hours
+    days = hours // 24
+    if g == "D":
+        return days
+    if g == "W":
+        return (days + 3) // 7   # Monday-start weeks (1970-01-01 was a Thursday)
+    return hours.astype("datetime64[h]").astype("datetime64[M]").astype(np.int64)
+
+
+def _period_labels(codes: np.ndarray, g: str) -> List[str]:
+    """Period start, except weeks: labelled by the closing Sunday like pandas "W"."""
+    if g == "H":
+        return list(np.datetime_as_string(codes.astype("datetime64[h]"), unit="m"))
+    if g == "D":
+        days = codes
+    elif g == "W":
+        days = codes * 7 + 3
+    else:
+        days = codes.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    return list(np.datetime_as_string(days.astype("datetime64[D]"), unit="D"))
+
 
+def _floats(a: np.ndarray) -> List[Optional[float]]:
+    return [float(x) if np.isfinite(x) else None for x in a]
+
+
+def build_cube(
+    hourly: Dict[str, np.ndarray],
+    cols: List[str],
+    *,
+    keep: Iterable[str] = (),
+    max_periods: int = CUBE_MAX_PERIODS,
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Rolls hourly aggregates up to every granularity in FREQS:
+      {g: {"period": [...], "rows": [...], "columns": {col: {"count", "sum", "mean", "min", "max"}}}}
+    Periods where every column is missing are dropped. Granularities with more than
+    `max_periods` periods are omitted unless in `keep`; returns (cube, omitted).
+    """
+    cube: Dict[str, Any] = {}
+    omitted: List[str] = []
+    for g in FREQS:
+        codes, inv = np.unique(_period_codes(hourly["hour"], g), return_inverse=True)
+        m = len(codes)
+        count = np.zeros((m, len(cols)))
+        total = np.zeros((m, len(cols)))
+        vmin = np.full((m, len(cols)), np.nan)
+        vmax = np.full((m, len(cols)), np.nan)
+        np.add.at(count, inv, hourly["count"])
+        np.add.at(total, inv, hourly["sum"])
+        np.fmin.at(vmin, inv, hourly["min"])
+        np.fmax.at(vmax, inv, hourly["max"])
+        rows = np.bincount(inv, weights=hourly["rows"], minlength=m)
+
+        nonempty = count.sum(axis=1) > 0
+        if nonempty.sum() > max_periods and g not in keep:
+            omitted.append(g)
+            continue
+        count, total, vmin, vmax = count[nonempty], total[nonempty], vmin[nonempty], vmax[nonempty]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        cube[g] = {
+            "period": _period_labels(codes[nonempty], g),
+            "rows": [int(r) for r in rows[nonempty]],
+            "columns": {
+                c: {
+                    "count": [int(x) for x in count[:, j]],
+                    "sum": _floats(total[:, j]),
+                    "mean": _floats(mean[:, j]),
+                    "min": _floats(vmin[:, j]),
+                    "max": _floats(vmax[:, j]),
+                }
+                for j, c in enumerate(cols)
+            },
+        }
+    return cube, omitted
+
+
+def cube_frame(cube: Dict[str, Any], g: str, stat: str = "mean") -> pd.DataFrame:
+    """One granularity of the cube as a frame (period strings x columns)."""
+    level = cube[g]
+    return pd.DataFrame(
+        {c: pd.Series(v[stat], dtype=float) for c, v in level["columns"].items()}
+    ).set_axis(level["period"])
+
+
+def _cube_rows(cube: Dict[str, Any], cols: List[str], max_periods: int = CHART_MAX_PERIODS) -> List[Dict[str, Any]]:
+    """
+    Chart data: one row per (granularity, column) holding that level's latest
+    `max_periods` periods and means as arrays; the specs flatten them to points.
+    """
+    return [
+        {"granularity": g, "column": c, "period": level["period"][-max_periods:], "value": level["columns"][c]["mean"][-max_periods:]}
+        for g, level in cube.items()
+        for c in cols
+    ]
+
+
+def timeseries_from_hourly(
+    out: Dict[str, Any],
+    hourly: Dict[str, np.ndarray],
+    use_num: List[str],
+    *,
+    freq: str = "D",
+    rolling_window: int = 7,
+) -> Dict[str, Any]:
+    """
+    Fills `out` (datetime_col, numeric_cols, n_points already set) from hourly
+    aggregates (see hourly_aggregates): the cube, trend and charts. Everything is
+    served from the cube. Both charts read the named dataset out["datasets"][CHART_DATASET]
+    (the means of every granularity, CHART_MAX_PERIODS latest periods each) and
+    switch between granularities client-side. Shared by the pandas and SQL backends.
+    """
+    datetime_col = out["datetime_col"]
+    out["freq"] = str(freq).upper() if str(freq).upper() in FREQS else "D"
+    _, label = FREQS[out["freq"]]
+
+    cube, omitted = build_cube(hourly, use_num, keep=(out["freq"],))
+    out["cube"] = cube
+    out["granularities"] = list(cube)
+    if omitted:
+        out["cube_omitted"] = {"granularities": omitted, "reason": f"more than {CUBE_MAX_PERIODS} periods"}
+
+    daily = cube_frame(cube, out["freq"])
+    # ISO date keys keep the pack output JSON-serializable for the LLM prompts
     out["daily_head"] = daily.head(10).to_dict()
     out["daily_tail"] = daily.tail(10).to_dict()
 
     col0 = use_num[0]
-    if col0 in daily.columns and len(daily) >= 2:
+    if len(daily) >= 2:
         first = float(daily[col0].iloc[0])
         last = float(daily[col0].iloc[-1])
         out["trend_first_last"] = {"col": col0, "first": first, "last": last, "delta": last - first}
@@ -49,61 +253,77 @@ def run_timeseries_pack(df: pd.DataFrame, datetime_col: str, numeric_cols: List[
             "severity": "info",
             "title": f"'{col0}' {direction} over the observed period",
             "evidence": f"First={first:.4g}, Last={last:.4g}, Delta={(last-first):.4g}",
-            "recommendation": "Consider checking seasonality or outliers using weekly/monthly aggregation.",
+            "recommendation": "Switch the trend chart's granularity (hourly to monthly) to separate the trend from "
+                              "short cycles; the ts_patterns results list seasonality, level shifts and anomalies.",
         })
 
-    daily_reset = daily.reset_index()
-    if daily_reset.columns[0] != datetime_col:
-        daily_reset = daily_reset.rename(columns={daily_reset.columns[0]: datetime_col})
+    chart_cols = use_num[:CHART_MAX_COLS]
+    out["datasets"] = {CHART_DATASET: _cube_rows(cube, chart_cols)}
+    params = [
+        {"name": "granularity", "value": out["freq"],
+         "bind": {"input": "select", "options": list(cube), "labels": [FREQS[g][1] for g in cube], "name": "Granularity "}},
+        {"name": "series", "value": col0, "bind": {"input": "select", "options": chart_cols, "name": "Column "}},
+    ]
+    selected = [
+        {"filter": "datum.granularity === granularity && datum.column === series"},
+        {"flatten": ["period", "value"], "as": [datetime_col, "value"]},
+        {"filter": "datum.value != null"},
+    ]
 
-    # Chart 1: daily line for first numeric
+    # Chart 1: trend line, any granularity/column of the cube
     spec_line = {
         "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
-        "description": f"Daily trend: {col0}",
-        "data": {"values": daily_reset[[datetime_col, col0]].to_dict(orient="records")},
+        "description": f"{label} trend: {col0}",
+        "data": {"name": CHART_DATASET},
+        "params": params,
+        "transform": selected,
         "mark": {"type": "line", "point": True, "color": "#4f46e5"},
         "encoding": {
             "x": {"field": datetime_col, "type": "temporal", "title": "Date"},
-            "y": {"field": col0, "type": "quantitative", "title": col0},
+            "y": {"field": "value", "type": "quantitative", "title": "Mean"},
             "tooltip": [
                 {"field": datetime_col, "type": "temporal"},
-                {"field": col0, "type": "quantitative"},
+                {"field": "column", "type": "nominal"},
+                {"field": "value", "type": "quantitative"},
             ],
         },
     }
 
     out["charts"].append({
         "id": "ts_daily_line",
-        "title": f"Daily trend — {col0}",
+        "title": f"{label} trend — {col0}",
         "spec": spec_line,
         "priority": 85,
         "tags": ["timeseries", "trend"],
     })
 
-    # Chart 2: rolling mean (7D) if enough points
-    if len(daily) >= 14:
-        roll = daily[[col0]].rolling(7, min_periods=3).mean().reset_index()
-        if roll.columns[0] != datetime_col:
-            roll = roll.rename(columns={roll.columns[0]: datetime_col})
-
+    # Chart 2: rolling mean if enough points (window computed client-side over the selected level)
+    w = max(2, int(rolling_window))
+    if len(daily) >= 2 * w:
         spec_roll = {
             "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
-            "description": f"7-day rolling average: {col0}",
-            "data": {"values": roll.to_dict(orient="records")},
+            "description": f"{w}-period rolling average: {col0}",
+            "data": {"name": CHART_DATASET},
+            "params": params,
+            "transform": [
+                *selected,
+                {"window": [{"op": "mean", "field": "value", "as": "rolling"}], "frame": [-(w - 1), 0],
+                 "sort": [{"field": datetime_col}]},
+            ],
             "mark": {"type": "line", "point": False, "color": "#4f46e5"},
             "encoding": {
                 "x": {"field": datetime_col, "type": "temporal", "title": "Date"},
-                "y": {"field": col0, "type": "quantitative", "title": f"{col0} (7D avg)"},
+                "y": {"field": "rolling", "type": "quantitative", "title": f"Mean ({w}-period avg)"},
                 "tooltip": [
                     {"field": datetime_col, "type": "temporal"},
-                    {"field": col0, "type": "quantitative"},
+                    {"field": "rolling", "type": "quantitative"},
                 ],
             },
         }
 
         out["charts"].append({
             "id": "ts_rolling_7d",
-            "title": f"Rolling average (7D) — {col0}",
+            "title": f"Rolling average ({w}{out['freq']}) — {col0}",
             "spec": spec_roll,
             "priority": 80,
             "tags": ["timeseries", "smoothing"],
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import warnings
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# aggregation levels of the timeseries cube this pack reads, with their step in days
+LEVELS = {"D": 1, "W": 7}
+MIN_PERIODS = {"D": 21, "W": 12}
+ANOMALY_WINDOW = {"D": 28, "W": 13}   # trailing periods per robust z-score (shorter windows misfire on noise)
+SEASONAL_STRENGTH = 0.4      # reported as seasonal at or above this strength
+CP_PENALTY = 3.0             # split kept when its SSE reduction beats CP_PENALTY * sigma^2 * log(T)
+CP_MIN_SHIFT = 2.0           # ... and the means differ by at least this many noise sigmas
+MAX_ANOMALIES = 10           # per column and level
+MAX_CHART_POINTS = 1500
+
+# named cycles per level: period (in periods of that level) -> label
+_CYCLES = {"D": {7: "weekly", 30.4: "monthly", 365.25: "yearly"}, "W": {4.35: "monthly", 52.18: "yearly"}}
+
+
+def _regular(level: Dict[str, Any], cols: List[str], g: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    The cube level on a gap-free grid: (Y (T x k) with gaps linearly interpolated,
+    observed mask (T x k), period labels). Empty periods are dropped in the cube.
+    """
+    days = np.array(level["period"], dtype="datetime64[D]").astype(np.int64)
+    codes = days // LEVELS[g]
+    T = int(codes.max() - codes.min() + 1)
+    pos = codes - codes.min()
+    Y = np.full((T, len(cols)), np.nan)
+    for j, c in enumerate(cols):
+        Y[pos, j] = np.array(level["columns"][c]["mean"], dtype=float)
+    observed = ~np.isnan(Y)
+    t = np.arange(T)
+    for j in range(len(cols)):
+        ok = observed[:, j]
+        if ok.any() and not ok.all():
+            Y[:, j] = np.interp(t, t[ok], Y[ok, j])
+    labels = list(np.datetime_as_string((days.min() + t * LEVELS[g]).astype("datetime64[D]"), unit="D"))
+    return Y, observed, labels
+
+
+def _counter(means: List[Optional[float]]) -> bool:
+    """Monotonic period means: a sequential id (or running total), nothing to detect."""
+    d = np.diff(np.array([m for m in means if m is not None], dtype=float))
+    return bool((d >= 0).all() or (d <= 0).all())
+
+
+def seasonality(Y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per column: dominant period from the FFT power spectrum of the linearly detrended
+    series (periods 2..T/3), and STL-style strength 1 - Var(remainder) / Var(detrended)
+    with the seasonal part taken as the phase means at that period. Pass the series
+    with level shifts removed, or the shift dominates both.
+    Returns (period, strength, seasonal component T x k). O(T log T) per column.
+    """
+    T, k = Y.shape
+    t = np.arange(T, dtype=float)
+    A = np.column_stack([t, np.ones(T)])
+    coef, *_ = np.linalg.lstsq(A, Y, rcond=None)
+    R = Y - A @ coef
+
+    power = np.abs(np.fft.rfft(R, axis=0)) ** 2
+    freqs = np.fft.rfftfreq(T)
+    with np.errstate(divide="ignore"):
+        periods = np.where(freqs > 0, 1.0 / np.where(freqs > 0, freqs, 1.0), np.inf)
+    usable = (periods >= 2) & (periods <= T / 3)
+    period = np.full(k, np.nan)
+    strength = np.zeros(k)
+    S = np.zeros_like(R)
+    if not usable.any():
+        return period, strength, S
+
+    peak = np.argmax(np.where(usable[:, None], power, -1.0), axis=0)
+    period = periods[peak]
+    for j in range(k):
+        p = int(round(period[j]))
+        phase = np.arange(T) % p
+        means = np.bincount(phase, weights=R[:, j], minlength=p) / np.bincount(phase, minlength=p)
+        S[:, j] = means[phase]
+        var = R[:, j].var()
+        strength[j] = max(0.0, 1.0 - (R[:, j] - S[:, j]).var() / var) if var > 0 else 0.0
+    return period, strength, S
+
+
+def _noise_sigma(y: np.ndarray) -> float:
+    """Robust noise scale from first differences (insensitive to level shifts)."""
+    d = np.diff(y)
+    mad = np.median(np.abs(d - np.median(d))) if len(d) else 0.0
+    return float(1.4826 * mad / np.sqrt(2))
+
+
+def changepoints(y: np.ndarray, *, max_changepoints: int = 3, min_size: int = 5) -> List[Tuple[int, float]]:
+    """
+    Mean-shift changepoints by binary segmentation over cumulative sums: each scan
+    scores every split of a segment in O(n) from the prefix sums; the best split is
+    kept while its SSE reduction beats the penalty. Returns [(index, gain)] sorted.
+    """
+    T = len(y)
+    S = np.concatenate([[0.0], np.cumsum(y)])
+    sigma = _noise_sigma(y)
+    penalty = CP_PENALTY * max(sigma, 1e-12) ** 2 * np.log(max(T, 2))
+
+    def best_split(a: int, b: int) -> Optional[Tuple[int, float]]:
+        t = np.arange(a + min_size, b - min_size + 1)
+        if len(t) == 0:
+            return None
+        n1, n2 = t - a, b - t
+        m1 = (S[t] - S[a]) / n1
+        m2 = (S[b] - S[t]) / n2
+        gain = n1 * n2 / (b - a) * (m1 - m2) ** 2
+        i = int(np.argmax(gain))
+        if abs(m1[i] - m2[i]) < CP_MIN_SHIFT * sigma:
+            return None
+        return int(t[i]), float(gain[i])
+
+    cands = {(0, T): best_split(0, T)}
+    found: List[Tuple[int, float]] = []
+    while len(found) < max_changepoints:
+        seg, best = max(((s, c) for s, c in cands.items() if c is not None), key=lambda sc: sc[1][1], default=(None, None))
+        if best is None or best[1] <= penalty:
+            break
+        found.append(best)
+        a, b = seg
+        del cands[seg]
+        cands[(a, best[0])] = best_split(a, best[0])
+        cands[(best[0], b)] = best_split(best[0], b)
+    return sorted(found)
+
+
+def robust_z(X: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling robust z-score of each point against the `window` points before it:
+    0.6745 * (x - median) / MAD, for all columns at once. NaNs (unobserved periods)
+    are left out of the windows; NaN for the first `window` points and flat windows.
+    """
+    T, k = X.shape
+    z = np.full((T, k), np.nan)
+    if T <= window:
+        return z
+    win = sliding_window_view(X[:-1], window, axis=0)          # (T - window, k, window)
+    median = np.nanmedian if np.isnan(X).any() else np.median   # nanmedian is several times slower
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)        # all-NaN windows
+        med = median(win, axis=-1)
+        mad = median(np.abs(win - med[..., None]), axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z[window:] = 0.6745 * (X[window:] - med) / np.where(mad > 0, mad, np.nan)
+    return z
+
+
+def _cycle_name(g: str, period: float) -> str:
+    for p, name in _CYCLES[g].items():
+        if abs(period - p) <= 0.1 * p:
+            return name
+    return f"{period:.1f}-{'day' if g == 'D' else 'week'}"
+
+
+def run_ts_patterns_pack(
+    ts_out: Dict[str, Any],
+    id_like: Optional[List[str]] = None,
+    *,
+    levels: Optional[List[str]] = None,
+    anomaly_window: Optional[int] = None,
+    z_threshold: float = 3.5,
+    max_changepoints: int = 3,
+) -> Dict[str, Any]:
+    """
+    Seasonality, changepoints and anomalies on the daily/weekly levels of the
+    timeseries pack's cube (`ts_out` is that pack's output), every numeric column
+    at once. Changepoints come first; seasonality is measured with the shifted
+    levels removed, and anomalies are scored on what is left after both.
+    Id-like columns that only count up are skipped.
+    Cost is O(T log T) per column and level, T = number of periods.
+    Returns {"levels": {g: {"n_periods", "columns": {col: {...}}}}, "summary", "insights", "charts"}.
+    """
+    out: Dict[str, Any] = {"levels": {}, "summary": {}, "insights": [], "charts": []}
+    cube = (ts_out or {}).get("cube") or {}
+    if not cube:
+        out["skipped"] = (ts_out or {}).get("skipped") or "No time-series cube."
+        return out
+
+    for g in levels or list(LEVELS):
+        level = cube.get(g)
+        if g not in LEVELS or not level:
+            continue
+        cols = [
+            c for c, v in level["columns"].items()
+            if sum(x is not None for x in v["mean"]) >= MIN_PERIODS[g] and not (c in (id_like or []) and _counter(v["mean"]))
+        ]
+        if not cols or len(level["period"]) < MIN_PERIODS[g]:
+            continue
+
+        Y, observed, labels = _regular(level, cols, g)
+        # piecewise-constant level between changepoints, per column
+        L = np.empty_like(Y)
+        cps: List[List[Dict[str, Any]]] = []
+        for j in range(len(cols)):
+            bounds = [0] + [i for i, _ in changepoints(Y[:, j], max_changepoints=max_changepoints)] + [len(Y)]
+            sigma = _noise_sigma(Y[:, j])
+            for a, b in zip(bounds, bounds[1:]):
+                L[a:b, j] = Y[a:b, j].mean()
+            cps.append([
+                {"period": labels[i], "before": float(L[a, j]), "after": float(L[i, j]), "shift": float(L[i, j] - L[a, j]),
+                 "shift_sigma": float((L[i, j] - L[a, j]) / sigma) if sigma > 0 else None}
+                for a, i in zip(bounds, bounds[1:-1])
+            ])
+
+        period, strength, S = seasonality(Y - L)
+        seasonal = strength >= SEASONAL_STRENGTH
+        remainder = Y - L - np.where(seasonal, S, 0.0)
+        z = robust_z(np.where(observed, remainder, np.nan), max(3, int(anomaly_window or ANOMALY_WINDOW[g])))
+
+        res: Dict[str, Any] = {}
+        for j, c in enumerate(cols):
+
+            zc = z[:, j]
+            flagged = np.flatnonzero(np.abs(np.nan_to_num(zc)) > z_threshold)
+            top = flagged[np.argsort(-np.abs(zc[flagged]), kind="stable")][:MAX_ANOMALIES]
+            res[c] = {
+                "seasonality": {"period": None if np.isnan(period[j]) else float(period[j]), "strength": float(strength[j]),
+                                "cycle": _cycle_name(g, period[j]) if seasonal[j] else None},
+                "changepoints": cps[j],
+                "n_anomalies": int(len(flagged)),
+                "anomalies": [{"period": labels[i], "value": float(Y[i, j]), "z": float(zc[i])} for i in sorted(top)],
+            }
+        out["levels"][g] = {"n_periods": int(len(Y)), "columns": res}
+        if "chart_level" not in out:
+            out["chart_level"] = g
+            _chart(out, g, labels, Y, observed, cols, res)
+
+    if not out["levels"]:
+        out["skipped"] = "Not enough daily/weekly periods for pattern detection."
+        return out
+
+    _summarize(out)
+    return out
+
+
+def _summarize(out: Dict[str, Any]) -> None:
+    """Counts over all levels; insights from the finest level only (the coarser one mostly repeats it)."""
+    seasonal, n_cp, n_anom = [], 0, 0
+    for g, lv in out["levels"].items():
+        unit = "day" if g == "D" else "week"
+        primary = g == out["chart_level"]
+        for c, r in lv["columns"].items():
+            s = r["seasonality"]
+            n_cp += len(r["changepoints"])
+            n_anom += r["n_anomalies"]
+            if not primary:
+                continue
+            if s["cycle"]:
+                seasonal.append(c)
+                out["insights"].append({
+                    "severity": "info",
+                    "title": f"'{c}' follows a {s['cycle']} cycle",
+                    "evidence": f"Seasonality strength {s['strength']:.2f} at a period of {s['period']:.1f} {unit}s ({g} level)",
+                    "recommendation": "Compare like-for-like periods (same weekday/month) before reading changes as trends.",
+                })
+            for cp in r["changepoints"][:1]:
+                out["insights"].append({
+                    "severity": "warning",
+                    "title": f"'{c}' shifted level around {cp['period']}",
+                    "evidence": f"Mean {cp['before']:.4g} before vs {cp['after']:.4g} after ({g} level)",
+                    "recommendation": "Check for a process, pricing or data-collection change at that date.",
+                })
+            if r["anomalies"]:
+                worst = max(r["anomalies"], key=lambda a: abs(a["z"]))
+                out["insights"].append({
+                    "severity": "warning",
+                    "title": f"'{c}' has {r['n_anomalies']} anomalous {unit}(s)",
+                    "evidence": f"Largest on {worst['period']}: {worst['value']:.4g} (robust z={worst['z']:.1f})",
+                    "recommendation": "Review these periods for incidents, outages or one-off events.",
+                })
+    out["summary"] = {
+        "levels": list(out["levels"]),
+        "seasonal_columns": seasonal,
+        "n_changepoints": n_cp,
+        "n_anomalies": n_anom,
+    }
+
+
+def _chart(out: Dict[str, Any], g: str, labels: List[str], Y: np.ndarray, observed: np.ndarray, cols: List[str], res: Dict[str, Any]) -> None:
+    """Series with anomalies and changepoints marked, for the column with the most findings."""
+    j = max(range(len(cols)), key=lambda i: (res[cols[i]]["n_anomalies"] + len(res[cols[i]]["changepoints"]), -i))
+    col = cols[j]
+    keep = slice(max(0, len(labels) - MAX_CHART_POINTS), None)
+    series = [{"period": p, "value": float(v)} for p, v, ok in zip(labels[keep], Y[keep, j], observed[keep, j]) if ok]
+    marks = [{"period": a["period"], "value": a["value"], "z": a["z"]} for a in res[col]["anomalies"]]
+    shifts = [{"period": cp["period"], "shift": cp["shift"]} for cp in res[col]["changepoints"]]
+
+    x = {"field": "period", "type": "temporal", "title": "Date"}
+    spec = {
+        "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+        "description": f"Anomalies and level shifts: {col}",
+        "layer": [
+            {"data": {"values": series}, "mark": {"type": "line", "color": "#4f46e5"},
+             "encoding": {"x": x, "y": {"field": "value", "type": "quantitative", "title": col}}},
+            {"data": {"values": marks}, "mark": {"type": "point", "filled": True, "size": 70, "color": "#dc2626"},
+             "encoding": {"x": x, "y": {"field": "value", "type": "quantitative"},
+                          "tooltip": [{"field": "period", "type": "temporal"}, {"field": "value", "type": "quantitative"},
+                                      {"field": "z", "type": "quantitative", "format": ".1f"}]}},
+            {"data": {"values": shifts}, "mark": {"type": "rule", "strokeDash": [4, 3], "color": "#f59e0b"},
+             "encoding": {"x": x, "tooltip": [{"field": "period", "type": "temporal"}, {"field": "shift", "type": "quantitative"}]}},
+        ],
+    }
+    out["charts"].append({
+        "id": "ts_patterns",
+        "title": f"Anomalies & level shifts ({'daily' if g == 'D' else 'weekly'}) — {col}",
+        "spec": spec,
+        "priority": 82,
+        "tags": ["timeseries", "anomalies"],
+    })
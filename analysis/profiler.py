@@ -1,8 +1,14 @@
 from __future__ import annotations
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+# free text: long, mostly distinct, several words per value (judged on the first non-null values)
+TEXT_SAMPLE_ROWS = 500
+TEXT_MIN_AVG_LEN = 15
+TEXT_MIN_UNIQUE = 0.3
+TEXT_MIN_TOKENS = 2.0
+
 def detect_datetime_columns(df: pd.DataFrame) -> List[str]:
     out: List[str] = []
     for c in df.columns:
@@ -19,6 +25,23 @@ def detect_datetime_columns(df: pd.DataFrame) -> List[str]:
                 out.append(str(c))
     return out
 
+def is_text_like(sample: pd.Series) -> bool:
+    """Free text rather than a category: average length, uniqueness ratio and words per value of a sample."""
+    s = sample.dropna().astype(str)
+    if s.empty:
+        return False
+    return bool(
+        s.str.len().mean() >= TEXT_MIN_AVG_LEN
+        and s.nunique() / len(s) >= TEXT_MIN_UNIQUE
+        and s.str.split().str.len().mean() >= TEXT_MIN_TOKENS
+    )
+
+def is_id_like(n_unique: int, *, n_rows: int) -> bool:
+    """Identifier-like by its share of distinct values; charts of such columns are skipped."""
+    if n_rows <= 0:
+        return False
+    return n_unique / float(n_rows) >= 0.90
+
 def column_roles(df: pd.DataFrame) -> Dict[str, List[str]]:
     numeric = [str(c) for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
     categorical = [str(c) for c in df.columns if (df[c].dtype == object) or pd.api.types.is_categorical_dtype(df[c])]
@@ -27,6 +50,10 @@ def column_roles(df: pd.DataFrame) -> Dict[str, List[str]]:
     # remove datetime from categorical (if parsed as object)
     categorical = [c for c in categorical if c not in datetime_cols]
 
+    # free-text object columns get the text pack instead of top-value counts
+    text = [c for c in categorical if df[c].dtype == object and is_text_like(df[c].dropna().head(TEXT_SAMPLE_ROWS))]
+    categorical = [c for c in categorical if c not in text]
+
     id_like: List[str] = []
     n = len(df)
     for c in df.columns:
@@ -36,7 +63,21 @@ def column_roles(df: pd.DataFrame) -> Dict[str, List[str]]:
         if nunique > 20 and (nunique / max(n, 1)) > 0.9:
             id_like.append(str(c))
 
-    return {"numeric": numeric, "categorical": categorical, "datetime": datetime_cols, "id_like": id_like}
+    return {"numeric": numeric, "categorical": categorical, "datetime": datetime_cols, "text": text, "id_like": id_like}
+
+def measure_columns(
+    numeric_cols: List[str],
+    id_like: Optional[List[str]],
+    is_integer: Callable[[str], bool],
+    *,
+    max_cols: int = 8,
+) -> List[str]:
+    """
+    Numeric columns worth aggregating. Only integer id-like columns are left out: the
+    uniqueness test above also marks continuous measures (prices, amounts) as id-like.
+    """
+    ids = set(id_like or [])
+    return [c for c in numeric_cols if not (c in ids and is_integer(c))][:max_cols]
 
 def basic_profile(df: pd.DataFrame) -> Dict[str, Any]:
     roles = column_roles(df)
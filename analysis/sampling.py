@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from analysis.correlation import pairwise_corr
+
+# Row budget per pipeline stage. Override with SAMPLE_BUDGET_<STAGE>=<rows>.
+STAGE_BUDGETS: Dict[str, int] = {
+    "correlation": 50_000,
+    "histogram": 20_000,
+    "profiling": 20_000,
+    "outliers": 10_000,
+    "text": 20_000,
+    "default": 100_000,
+}
+
+MIN_PER_STRATUM = 5
+Z_95 = 1.959964
+
+
+def stage_budget(stage: str) -> int:
+    env = os.getenv(f"SAMPLE_BUDGET_{stage.upper()}")
+    if env and env.isdigit():
+        return int(env)
+    return STAGE_BUDGETS.get(stage, STAGE_BUDGETS["default"])
+
+
+def _time_strata(s: pd.Series, freq: str) -> pd.Series:
+    ts = pd.to_datetime(s, errors="coerce")
+    return ts.dt.to_period(freq).astype(str)
+
+
+def stratified_positions(keys: pd.Series, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Proportional allocation across strata (missing keys form their own stratum), with at
+    least MIN_PER_STRATUM rows from small strata. Vectorized: one lexsort over
+    (stratum, random priority) and a rank-within-stratum cut.
+    """
+    codes, _ = pd.factorize(keys, use_na_sentinel=False)
+    n = len(codes)
+    counts = np.bincount(codes)
+
+    alloc = np.floor(k * counts / max(n, 1)).astype(np.int64)
+    # the per-stratum floor only applies while it cannot blow the budget
+    floor = MIN_PER_STRATUM if len(counts) * MIN_PER_STRATUM <= k // 2 else 0
+    alloc = np.minimum(counts, np.maximum(alloc, np.minimum(counts, floor)))
+
+    order = np.lexsort((rng.random(n), codes))
+    sorted_codes = codes[order]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank = np.arange(n) - starts[sorted_codes]
+    return np.sort(order[rank < alloc[sorted_codes]])
+
+
+class Sampler:
+    """
+    Per-dataset sampling engine. Row positions are computed once per
+    (budget, strata) and reused by every stage that asks for the same sample;
+    parsed datetime columns and correlation matrices are cached the same way.
+    """
+
+    def __init__(self, df: pd.DataFrame, *, seed: int = 42):
+        self.df = df
+        self.seed = seed
+        self._positions: Dict[Tuple[Any, ...], np.ndarray] = {}
+        self._datetimes: Dict[str, pd.Series] = {}
+        self._corr: Dict[Tuple[str, int], List[Tuple[List[str], np.ndarray, np.ndarray, Dict[str, Any]]]] = {}
+
+    def datetimes(self, col: str) -> pd.Series:
+        """`col` parsed as datetimes (unparseable -> NaT), parsed once per dataset."""
+        ts = self._datetimes.get(col)
+        if ts is None:
+            ts = pd.to_datetime(self.df[col], errors="coerce")
+            self._datetimes[col] = ts
+        return ts
+
+    def correlation(
+        self,
+        columns: List[str],
+        *,
+        method: str = "pearson",
+        budget: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        (corr, n_pairs, info) for `columns` on the uniform "correlation" sample of
+        `budget` rows (analysis.correlation.pairwise_corr). Matrices are cached per
+        (method, sample size); columns covered by a cached matrix are sliced from it,
+        so the numeric pack's matrix also serves the hypothesis verifier.
+        """
+        k = min(int(budget if budget is not None else stage_budget("correlation")), int(len(self.df)))
+        entries = self._corr.setdefault((method, k), [])
+        for cached, corr, n, info in entries:
+            pos = {c: i for i, c in enumerate(cached)}
+            if all(c in pos for c in columns):
+                idx = np.array([pos[c] for c in columns], dtype=np.int64)
+                return corr[np.ix_(idx, idx)], n[np.ix_(idx, idx)], info
+
+        d, info = self.sample("correlation", budget=k, columns=list(columns))
+        corr, n = pairwise_corr(d.to_numpy(dtype=float, na_value=np.nan), method)
+        info = {**info, "corr_method": method}
+        entries.append((list(columns), corr, n, info))
+        return corr, n, info
+
+    def sample(
+        self,
+        stage: str,
+        *,
+        budget: Optional[int] = None,
+        columns: Optional[list] = None,
+        strata: Optional[str] = None,
+        time_freq: Optional[str] = None,
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Returns (sample, info). `strata` stratifies on a categorical column, or on a
+        datetime column bucketed by `time_freq` (e.g. "M"). Frames within budget are
+        returned as-is.
+        """
+        n = int(len(self.df))
+        k = int(budget if budget is not None else stage_budget(stage))
+        if strata is not None and strata not in self.df.columns:
+            strata = None
+
+        info: Dict[str, Any] = {"stage": stage, "n_total": n, "budget": k}
+        if n <= k:
+            info.update({"method": "full", "n_sample": n, "fraction": 1.0})
+            frame = self.df if columns is None else self.df[columns]
+            return frame, info
+
+        key = (k, strata, time_freq)
+        pos = self._positions.get(key)
+        if pos is None:
+            rng = np.random.default_rng(self.seed)
+            if strata is None:
+                pos = np.sort(rng.choice(n, size=k, replace=False))
+            else:
+                keys = _time_strata(self.datetimes(strata), time_freq) if time_freq else self.df[strata]
+                pos = stratified_positions(keys, k, rng)
+            self._positions[key] = pos
+
+        info.update({
+            "method": "stratified" if strata else "uniform",
+            "strata": strata,
+            "time_freq": time_freq,
+            "n_sample": int(len(pos)),
+            "fraction": float(len(pos) / n),
+            "seed": self.seed,
+        })
+        frame = self.df.iloc[pos] if columns is None else self.df[columns].iloc[pos]
+        return frame, info
+
+
+# -------------------------
+# Error estimates for sampled statistics
+# -------------------------
+def _fpc(n: int, n_total: Optional[int]) -> float:
+    """Finite population correction; a full-population "sample" has no sampling error."""
+    if not n_total or n_total <= 1:
+        return 1.0
+    if n >= n_total:
+        return 0.0
+    return math.sqrt((n_total - n) / (n_total - 1))
+
+
+def mean_ci(values: pd.Series, *, n_total: Optional[int] = None, z: float = Z_95) -> Dict[str, Any]:
+    """Normal interval for the mean of sampled values; `n_total` = non-missing values in the population."""
+    v = pd.Series(values).dropna()
+    n = int(len(v))
+    if n < 2:
+        return {"estimate": float(v.mean()) if n else None, "n": n}
+    est = float(v.mean())
+    se = float(v.std(ddof=1) / math.sqrt(n)) * _fpc(n, n_total)
+    return {"estimate": est, "se": se, "ci_low": est - z * se, "ci_high": est + z * se, "n": n}
+
+
+def proportion_ci(p: float, n: int, *, n_total: Optional[int] = None, z: float = Z_95) -> Dict[str, Any]:
+    """Wald interval for a share `p` measured on `n` sampled values, clipped to [0, 1]."""
+    if n <= 0:
+        return {"estimate": None, "n": 0}
+    se = math.sqrt(max(p * (1 - p), 0.0) / n) * _fpc(n, n_total)
+    return {"estimate": p, "se": se, "ci_low": max(0.0, p - z * se), "ci_high": min(1.0, p + z * se), "n": n}
+
+
+# Fisher z variance factor per correlation method: 1/(n-3) for Pearson, 1.06/(n-3) for
+# Spearman (Fieller, Hartley & Pearson 1957); other methods get no interval
+_CORR_VAR = {"pearson": 1.0, "spearman": 1.06}
+
+
+def corr_ci(r: float, n: int, *, method: str = "pearson", z: float = Z_95) -> Dict[str, Any]:
+    """Fisher z interval for a Pearson or Spearman correlation."""
+    if n <= 3 or not np.isfinite(r) or method not in _CORR_VAR:
+        return {"estimate": r, "n": n}
+    fz = math.atanh(max(-0.999999, min(0.999999, r)))
+    se = math.sqrt(_CORR_VAR[method] / (n - 3))
+    return {"estimate": r, "se": se, "ci_low": math.tanh(fz - z * se), "ci_high": math.tanh(fz + z * se), "n": n}
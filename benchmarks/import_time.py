@@ -0,0 +1,75 @@
+"""
+Cold-start budget for the API process.
+
+    python benchmarks/import_time.py [--module tools.main] [--budget 2.0] [--runs 3]
+
+Imports the module in fresh interpreters (best of --runs), prints the slowest
+imports, and exits 1 when the import takes longer than the budget
+(IMPORT_BUDGET_S, default 2.0s) or when a lazily loaded dependency
+(tools.preload.HEAVY_MODULES) was imported eagerly.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from tools.preload import HEAVY_MODULES  # noqa: E402  (light: stdlib only)
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t0
+print("RESULT " + json.dumps({{"seconds": elapsed, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> Tuple[Dict, List[Tuple[int, str]]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "JOZU_PRELOAD": "lazy"},
+    )
+    result = next((json.loads(l[7:]) for l in proc.stdout.splitlines() if l.startswith("RESULT ")), None)
+    if result is None:
+        raise SystemExit(f"import of {module} failed:\n{proc.stderr[-2000:]}")
+    # top-level packages only (indent of one level), by cumulative microseconds
+    top = [(int(m.group(2)), m.group(4)) for m in map(_LINE.match, proc.stderr.splitlines()) if m and len(m.group(3)) <= 3]
+    return result, sorted(top, reverse=True)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--module", default="tools.main")
+    ap.add_argument("--budget", type=float, default=float(os.getenv("IMPORT_BUDGET_S", "2.0")))
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    runs = [measure(args.module) for _ in range(max(1, args.runs))]
+    best, top = min(runs, key=lambda r: r[0]["seconds"])
+
+    print(f"import {args.module}: {best['seconds']:.3f}s (best of {len(runs)}, budget {args.budget:.1f}s)")
+    for us, name in top[:10]:
+        print(f"  {us / 1e6:7.3f}s  {name}")
+
+    failed = False
+    if best["heavy"]:
+        print(f"FAIL: imported eagerly: {', '.join(best['heavy'])}")
+        failed = True
+    if best["seconds"] > args.budget:
+        print(f"FAIL: over budget by {best['seconds'] - args.budget:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())